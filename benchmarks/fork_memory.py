@@ -0,0 +1,131 @@
+"""Per-worker memory of forked workers with and without swirl.warmup().
+
+Registers a synthetic API, forks workers that each serve the spec once,
+then reports each worker's USS (private memory) and PSS (proportional
+share of the pages shared with the parent and the other workers).  Linux
+only (reads /proc/<pid>/smaps_rollup).
+
+Usage:
+    python benchmarks/fork_memory.py [--handlers 2000] [--workers 4] [--no-warmup]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tornado.web  # noqa: E402
+
+import tornado_swirl as swirl  # noqa: E402
+from tornado_swirl.views import spec_key, warm_spec  # noqa: E402
+
+SERVERS = [{'url': 'http://localhost/', 'description': 'benchmark'}]
+
+DOCSTRING = """Operation {index} summary.
+
+Long description of operation {index}.
+
+Path Parameters:
+    item_id (integer) -- The item id
+
+Headers:
+    X-Tenant (string) -- required. Tenant identifier
+    X-Request-Id (string) -- Request identifier
+
+Query Parameters:
+    cursor (string) -- Page cursor
+    limit (integer) -- Page size
+
+Response:
+    out (Item{index}) -- The item
+
+Errors:
+    400 -- Bad request
+    404 -- Not found
+"""
+
+SCHEMA_DOCSTRING = """Item {index}
+
+Properties:
+    name (string) -- required. Item name
+    kind (enum[a, b, c, d]) -- Item kind
+    tags ([string]) -- Item tags
+"""
+
+
+def register(count):
+    """Registers count handlers and schemas."""
+    for index in range(count):
+        def get(self, item_id):
+            pass
+        get.__doc__ = DOCSTRING.format(index=index)
+        swirl.restapi(r'/items%d/(?P<item_id>\d+)' % index)(
+            type('Handler%d' % index, (tornado.web.RequestHandler,), {'get': get}))
+        swirl.schema(type('Item%d' % index, (object,),
+                          {'__doc__': SCHEMA_DOCSTRING.format(index=index)}))
+
+
+def memory():
+    """Returns (uss, pss) of the current process in KiB."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(':')] = int(parts[1])
+    uss = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    return uss, values.get('Pss', 0)
+
+
+def worker(app, write_fd, read_fd):
+    """Serves the spec once, waits for all workers then reports memory."""
+    registry = app.registry.snapshot()
+    key, _ = spec_key(registry, SERVERS)
+    entry = app.spec_cache.entries.get(key)
+    if entry is None:
+        warm_spec(app.spec_cache, registry)
+        entry = app.spec_cache.entries.get(key)
+    len(entry.body)
+    os.write(write_fd, b'.')
+    os.read(read_fd, 1)  # every worker done, PSS now splits shared pages
+    os.write(write_fd, ('%d %d\n' % memory()).encode('ascii'))
+    os._exit(0)  # pylint: disable=protected-access
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--handlers', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--no-warmup', action='store_true')
+    args = parser.parse_args()
+
+    register(args.handlers)
+    swirl.describe(title='Benchmark', servers=SERVERS)
+    app = swirl.Application(swirl.api_routes())
+    if not args.no_warmup:
+        swirl.warmup(app)
+
+    results_r, results_w = os.pipe()
+    go_r, go_w = os.pipe()
+    pids = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            worker(app, results_w, go_r)
+        pids.append(pid)
+
+    with os.fdopen(results_r, 'rb') as results:
+        results.read(args.workers)
+        os.write(go_w, b'.' * args.workers)
+        lines = [results.readline().decode('ascii').split() for _ in pids]
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    print('warmup: %s, handlers: %d' % (not args.no_warmup, args.handlers))
+    print('%-8s %12s %12s' % ('worker', 'USS (KiB)', 'PSS (KiB)'))
+    for index, (uss, pss) in enumerate(lines):
+        print('%-8d %12s %12s' % (index, uss, pss))
+
+
+if __name__ == '__main__':
+    main()
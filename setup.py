@@ -15,7 +15,11 @@ setup(name='tornado-swirl',
       package_data={
           'tornado_swirl': [
               'openapi/*.*',
-              'static/*.*',
+              # source maps are never served, leave them out of the package
+              'static/*.css',
+              'static/*.js',
+              'static/*.png',
+              'static/index.html',
           ]
       },
       description='Extract swagger specs from your tornado project',
@@ -25,6 +29,11 @@ setup(name='tornado-swirl',
       install_requires=[
           'tornado>=5.1.1'
       ],
+      entry_points={
+          'console_scripts': [
+              'swirl-export=tornado_swirl.export:main',
+          ],
+      },
       classifiers=[
           'Development Status :: 3 - Alpha',
           'Intended Audience :: Developers',
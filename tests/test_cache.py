@@ -0,0 +1,107 @@
+#pylint: disable=all
+import threading
+import time
+
+from tornado.gen import multi, sleep
+from tornado.testing import AsyncTestCase, gen_test
+
+from tornado_swirl.cache import LRUCache, SpecCache, make_entry
+
+
+class TestSpecCache(AsyncTestCase):
+
+    @gen_test
+    def test_single_flight(self):
+        cache = SpecCache()
+        calls = []
+
+        def producer():
+            calls.append(threading.current_thread())
+            time.sleep(0.05)
+            return make_entry(b'{}')
+
+        entries = yield multi([cache.fetch('key', producer) for _ in range(10)])
+        assert len(calls) == 1
+        assert calls[0] is not threading.current_thread()
+        assert all(entry is entries[0] for entry in entries)
+
+        entry = yield cache.fetch('key', producer)
+        assert entry is entries[0]
+        assert len(calls) == 1
+
+    @gen_test
+    def test_failed_build_is_not_cached(self):
+        cache = SpecCache()
+
+        def producer():
+            raise ValueError('boom')
+
+        try:
+            yield cache.fetch('key', producer)
+            assert False
+        except ValueError:
+            pass
+        entry = yield cache.fetch('key', lambda: make_entry(b'{}'))
+        assert entry.body == b'{}'
+
+    @gen_test
+    def test_stale_while_revalidate(self):
+        cache = SpecCache()
+        old = yield cache.fetch((1, 'v'), lambda: make_entry(b'old'), 'v', 60)
+
+        def producer():
+            time.sleep(0.05)
+            return make_entry(b'new')
+
+        entry = yield cache.fetch((2, 'v'), producer, 'v', 60)
+        assert entry is old
+        yield sleep(0.2)
+        entry = yield cache.fetch((2, 'v'), producer, 'v', 60)
+        assert entry.body == b'new'
+
+    @gen_test
+    def test_max_staleness(self):
+        cache = SpecCache()
+        old = yield cache.fetch((1, 'v'), lambda: make_entry(b'old'), 'v', 0.05)
+
+        def producer():
+            time.sleep(0.2)
+            return make_entry(b'new')
+
+        entry = yield cache.fetch((2, 'v'), producer, 'v', 0.05)
+        assert entry is old
+        yield sleep(0.1)
+        entry = yield cache.fetch((2, 'v'), producer, 'v', 0.05)
+        assert entry.body == b'new'
+
+    @gen_test
+    def test_failed_revalidation_is_logged(self):
+        cache = SpecCache()
+        old = yield cache.fetch((1, 'v'), lambda: make_entry(b'old'), 'v', 60)
+
+        def producer():
+            raise ValueError('boom')
+
+        with self.assertLogs('tornado_swirl', 'ERROR') as logs:
+            entry = yield cache.fetch((2, 'v'), producer, 'v', 60)
+            assert entry is old
+            yield sleep(0.1)
+        assert 'boom' in logs.output[0]
+
+    @gen_test
+    def test_no_stale_serving_by_default(self):
+        cache = SpecCache()
+        yield cache.fetch((1, 'v'), lambda: make_entry(b'old'), 'v')
+        entry = yield cache.fetch((2, 'v'), lambda: make_entry(b'new'), 'v')
+        assert entry.body == b'new'
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
@@ -1,4 +1,5 @@
 #pylint: disable=all
+from tornado_swirl import memory_report
 from tornado_swirl.docparser import parse_from_docstring, PathSpec
 
 
@@ -380,4 +381,24 @@ def test_square_brackets_in_name():
     path_spec = parse_from_docstring(docstring)
     assert path_spec.query_params
     assert path_spec.query_params.get('filter[job_id]')
-    
\ No newline at end of file
+    
+
+def test_interned_descriptions():
+    docstring = """Test doc
+
+    Headers:
+        X-Tenant (string) -- Tenant identifier
+
+    Response:
+        out (Tenant) -- Tenant identifier
+    """
+    before = memory_report()
+    spec1 = parse_from_docstring(docstring)
+    spec2 = parse_from_docstring(docstring)
+    after = memory_report()
+
+    assert spec1.header_params['X-Tenant'].description is spec2.header_params['X-Tenant'].description
+    assert spec1.responses['200'].description is spec1.header_params['X-Tenant'].description
+    assert spec1.responses['200'].type.name is spec2.responses['200'].type.name
+    assert after['hits'] > before['hits']
+    assert after['bytes_saved'] > before['bytes_saved']
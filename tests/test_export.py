@@ -0,0 +1,39 @@
+#pylint: disable=all
+import gzip
+import json
+import os
+import re
+import tempfile
+
+from tornado.web import RequestHandler
+
+import tornado_swirl.swagger as swirl
+from tornado_swirl.export import export
+
+
+def test_export():
+    @swirl.restapi('/exported')
+    class ExportedHandler(RequestHandler):
+        def get(self):
+            """Exported test"""
+
+    out_dir = tempfile.mkdtemp()
+    export(out_dir, servers=[{'url': 'https://api.example.com'}])
+    files = os.listdir(out_dir)
+
+    with open(os.path.join(out_dir, 'spec.json'), 'rb') as spec_file:
+        body = spec_file.read()
+    spec = json.loads(body.decode('utf-8'))
+    assert '/exported' in spec['paths']
+    assert spec['servers'] == [{'url': 'https://api.example.com'}]
+    with gzip.open(os.path.join(out_dir, 'spec.json.gz')) as spec_file:
+        assert spec_file.read() == body
+
+    with open(os.path.join(out_dir, 'index.html')) as index:
+        html = index.read()
+    assert 'new URL("spec.json"' in html
+    bundle = re.search(r'src="\./(swagger-ui-bundle\.[0-9a-f]{12}\.js)"', html).group(1)
+    assert bundle in files
+    assert bundle + '.gz' in files
+    assert 'swagger-ui-bundle.js' not in files
+    assert not [name for name in files if name.endswith('.map')]
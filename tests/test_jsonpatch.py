@@ -0,0 +1,48 @@
+#pylint: disable=all
+import pytest
+
+from tornado_swirl.jsonpatch import apply, diff
+from tornado_swirl.jsonpointer import PointerError
+
+SRC = {'paths': {'/a': {'get': {'summary': 'A', 'tags': ['x', 'y', 'z']}},
+                 '/b/c': {'get': {'summary': 'B'}}},
+       'info': {'version': '1'}, 'list': [1, 2, 3, 4], 'flag': 1}
+
+
+def test_diff():
+    dst = {'paths': {'/a': {'get': {'summary': 'A2', 'tags': ['x', 'z']}},
+                     '/d': {'get': {'summary': 'D'}}},
+           'info': {'version': '1'}, 'list': [1, 5, 6, 4], 'flag': True}
+    assert diff(SRC, dst) == [
+        {'op': 'replace', 'path': '/flag', 'value': True},
+        {'op': 'replace', 'path': '/list/1', 'value': 5},
+        {'op': 'replace', 'path': '/list/2', 'value': 6},
+        {'op': 'remove', 'path': '/paths/~1b~1c'},
+        {'op': 'replace', 'path': '/paths/~1a/get/summary', 'value': 'A2'},
+        {'op': 'remove', 'path': '/paths/~1a/get/tags/1'},
+        {'op': 'add', 'path': '/paths/~1d', 'value': {'get': {'summary': 'D'}}},
+    ]
+    assert apply(SRC, diff(SRC, dst)) == dst
+    assert diff(SRC, SRC) == []
+
+
+@pytest.mark.parametrize('src,dst', [
+    ([1, 2, 3], [0, 1, 2, 3]),
+    ([1, 2, 3], [1, 2, 3, 4, 5]),
+    ([1, 2, 3, 4, 5], [1, 5]),
+    ([], [{'a': 1}]),
+    ([{'a': 1}, {'b': 2}], [{'a': 2}]),
+    ({'a': [1]}, {'a': {'b': 1}}),
+    ('old', ['new']),
+])
+def test_roundtrip(src, dst):
+    assert apply(src, diff(src, dst)) == dst
+
+
+def test_apply_errors():
+    with pytest.raises(PointerError):
+        apply(SRC, [{'op': 'replace', 'path': '/nope', 'value': 1}])
+    with pytest.raises(PointerError):
+        apply(SRC, [{'op': 'remove', 'path': '/list/4'}])
+    assert apply(SRC, [{'op': 'add', 'path': '/list/-', 'value': 5}])['list'] == [1, 2, 3, 4, 5]
+    assert SRC['list'] == [1, 2, 3, 4]
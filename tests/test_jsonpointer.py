@@ -0,0 +1,35 @@
+#pylint: disable=all
+import pytest
+
+from tornado_swirl.jsonpointer import PointerError, parse, project, resolve, to_pointer
+
+DOC = {'paths': {'/orders/{id}': {'get': {'summary': 'Order', 'tags': ['a', 'b']}}},
+       'info': {'title': 'T', 'version': '1'}, 'm~n': 1,
+       'components': {'schemas': {'User': {}, 'Item': {'type': 'object'}}}}
+
+
+def test_parse():
+    assert parse('') == []
+    assert parse('/paths/~1orders~1{id}/get') == ['paths', '/orders/{id}', 'get']
+    assert parse('#/paths/~1orders~1%7Bid%7D/get') == ['paths', '/orders/{id}', 'get']
+    assert parse('/m~0n') == ['m~n']
+    assert to_pointer(['paths', '/orders/{id}', 'm~n']) == '/paths/~1orders~1{id}/m~0n'
+    with pytest.raises(PointerError):
+        parse('paths')
+
+
+def test_resolve():
+    assert resolve(DOC, parse('#/paths/~1orders~1{id}/get/summary')) == 'Order'
+    assert resolve(DOC, parse('/paths/~1orders~1{id}/get/tags/1')) == 'b'
+    assert resolve(DOC, []) is DOC
+    for pointer in ('/nope', '/paths/~1orders~1{id}/get/tags/2', '/info/title/x',
+                    '/paths/~1orders~1{id}/get/tags/01'):
+        with pytest.raises(PointerError):
+            resolve(DOC, parse(pointer))
+
+
+def test_project():
+    assert project(DOC, ['info/title', 'components/schemas/User', 'nope', 'info/nope/x']) == {
+        'info': {'title': 'T'}, 'components': {'schemas': {'User': {}}}}
+    assert project(DOC, ['info', 'info/title']) == {'info': DOC['info']}
+    assert DOC['info'] == {'title': 'T', 'version': '1'}
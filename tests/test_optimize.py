@@ -0,0 +1,131 @@
+#pylint: disable=all
+import copy
+
+from tornado_swirl.builder import tag_subset
+from tornado_swirl.optimize import compact, dedupe_components, hoist_schemas
+
+
+def _param(name, ptype='string'):
+    return {'in': 'query', 'name': name, 'required': False, 'description': '',
+            'schema': {'type': ptype}}
+
+
+def _operation(params, tags=None):
+    operation = {'parameters': params,
+                 'responses': {'200': {'description': 'OK', 'content': None},
+                               '404': {'description': 'Not found', 'content': None}}}
+    if tags:
+        operation['tags'] = tags
+    return operation
+
+
+def _doc():
+    return {'openapi': '3.0.0', 'paths': {
+        '/a': {'get': _operation([_param('page', 'integer'), _param('q')], ['a'])},
+        '/b': {'get': _operation([_param('page', 'integer')], ['b']),
+               'post': _operation([_param('q', 'integer')], ['b'])},
+    }}
+
+
+def test_dedupe_parameters_and_responses():
+    doc = dedupe_components(_doc())
+    components = doc['components']
+    assert components['parameters'] == {'query.page': _param('page', 'integer')}
+    assert doc['paths']['/a']['get']['parameters'] == [
+        {'$ref': '#/components/parameters/query.page'}, _param('q')]
+    assert doc['paths']['/b']['get']['parameters'] == [
+        {'$ref': '#/components/parameters/query.page'}]
+    assert doc['paths']['/b']['post']['parameters'] == [_param('q', 'integer')]
+    assert sorted(components['responses']) == ['Response200', 'Response404']
+    assert doc['paths']['/b']['post']['responses']['404'] == {
+        '$ref': '#/components/responses/Response404'}
+
+
+def test_dedupe_name_collisions():
+    doc = _doc()
+    doc['paths']['/c'] = {'get': _operation([_param('q')]), 'put': _operation([_param('q', 'integer')])}
+    dedupe_components(doc)
+    names = sorted(doc['components']['parameters'])
+    assert len(names) == 3 and names[0] == 'query.page'
+    assert all(name.startswith('query.q.') for name in names[1:])
+    assert dedupe_components(_doc()) == dedupe_components(_doc())  # deterministic
+
+
+def test_dedupe_nothing_repeated():
+    doc = {'paths': {'/a': {'get': _operation([_param('q')])}}}
+    assert dedupe_components(copy.deepcopy(doc))['paths'] == doc['paths']
+
+
+def test_tag_subset_keeps_referenced_components():
+    subset = tag_subset(dedupe_components(_doc()), 'a')
+    assert sorted(subset['components']['parameters']) == ['query.page']
+    subset = tag_subset(dedupe_components(_doc()), 'b')
+    assert sorted(subset['components']['parameters']) == ['query.page']
+    assert sorted(subset['components']['responses']) == ['Response200', 'Response404']
+
+
+def _enum_param(name):
+    return {'in': 'query', 'name': name, 'required': False, 'description': '',
+            'schema': {'type': 'string', 'enum': ['red', 'green', 'blue']}}
+
+
+def test_hoist_schemas():
+    colors = {'type': 'string', 'enum': ['red', 'green', 'blue']}
+    doc = {'paths': {
+        '/a': {'get': {'parameters': [_enum_param('color'), _param('q')], 'responses': {}}},
+        '/b': {'get': {'parameters': [_enum_param('tint')], 'responses': {
+            '200': {'description': 'OK', 'content': {'application/json': {'schema': {
+                'type': 'array', 'items': copy.deepcopy(colors)}}}}}}},
+    }, 'components': {'schemas': {'Car': {'type': 'object', 'properties': {
+        'color': copy.deepcopy(colors), 'name': {'type': 'string'}}}}}}
+    hoist_schemas(doc, min_size=30)
+
+    names = [name for name in doc['components']['schemas'] if name.startswith('Enum.')]
+    assert len(names) == 1 and doc['components']['schemas'][names[0]] == colors
+    ref = {'$ref': '#/components/schemas/' + names[0]}
+    assert doc['paths']['/a']['get']['parameters'][0]['schema'] == ref
+    assert doc['paths']['/a']['get']['parameters'][1]['schema'] == {'type': 'string'}
+    assert doc['paths']['/b']['get']['responses']['200']['content']['application/json'][
+        'schema']['items'] == ref
+    assert doc['components']['schemas']['Car']['properties']['color'] == ref
+
+
+def test_hoist_schemas_outermost():
+    array = {'type': 'array', 'items': {'type': 'string', 'enum': ['red', 'green', 'blue']}}
+    doc = {'paths': {'/a': {'get': {'parameters': [
+        {'in': 'query', 'name': 'a', 'schema': copy.deepcopy(array)},
+        {'in': 'query', 'name': 'b', 'schema': copy.deepcopy(array)}]}}}}
+    hoisted = hoist_schemas(copy.deepcopy(doc), min_size=30)
+    assert sorted(name.split('.')[0] for name in hoisted['components']['schemas']) == ['Array']
+    assert hoisted == hoist_schemas(copy.deepcopy(doc), min_size=30)  # deterministic
+    assert 'components' not in hoist_schemas(copy.deepcopy(doc), min_size=1000)
+
+
+def test_compact():
+    doc = {'openapi': '3.0.0', 'info': {'title': 'T', 'description': None, 'version': '1'},
+           'servers': [], 'paths': {'/a/{id}': {'get': {
+               'operationId': 'A.get', 'summary': 'Get', 'description': '',
+               'parameters': [
+                   {'in': 'path', 'name': 'id', 'required': True, 'description': '',
+                    'schema': {'type': 'integer', 'default': ''}},
+                   {'in': 'query', 'name': 'q', 'required': False, 'description': 'Query',
+                    'schema': {'type': 'string', 'enum': ['', 'x']}}],
+               'responses': {'200': {'description': '', 'content': None}}},
+               'post': {'parameters': [], 'responses': {}}}},
+           'components': {'schemas': {'Empty': {}, 'Obj': {
+               'type': 'object', 'description': '', 'example': {'description': ''},
+               'properties': {'description': {'type': 'string', 'description': ''}}}}}}
+    compacted = compact(doc)
+    assert compacted['info'] == {'title': 'T', 'version': '1'}
+    assert 'servers' not in compacted
+    get = compacted['paths']['/a/{id}']['get']
+    assert get == {'operationId': 'A.get', 'summary': 'Get', 'parameters': [
+        {'in': 'path', 'name': 'id', 'required': True, 'schema': {'type': 'integer', 'default': ''}},
+        {'in': 'query', 'name': 'q', 'description': 'Query',
+         'schema': {'type': 'string', 'enum': ['', 'x']}}],
+        'responses': {'200': {'description': ''}}}
+    assert compacted['paths']['/a/{id}']['post'] == {'responses': {}}
+    assert compacted['components']['schemas'] == {'Empty': {}, 'Obj': {
+        'type': 'object', 'example': {'description': ''},
+        'properties': {'description': {'type': 'string'}}}}
+    assert doc['info']['description'] is None  # not modified
@@ -0,0 +1,73 @@
+#pylint: disable=all
+import logging
+
+from tornado.web import RequestHandler
+
+import tornado_swirl.settings as settings
+import tornado_swirl.swagger as swirl
+from tornado_swirl.refgraph import RefGraph
+
+
+def test_reachable():
+    graph = RefGraph({'A.get': {'Order'}, 'B.get': {'User'}},
+                     {'Order': {'Item', 'User'}, 'Item': set(), 'User': set(), 'Orphan': {'Item'}})
+    assert graph.reachable() == {'Order', 'Item', 'User'}
+    assert graph.reachable(['B.get']) == {'User'}
+    assert graph.closure(['Orphan']) == {'Orphan', 'Item'}
+
+
+def test_dangling_and_cycles():
+    graph = RefGraph({'A.get': {'Node', 'Missing'}},
+                     {'Node': {'Node'}, 'Ping': {'Pong'}, 'Pong': {'Ping', 'Gone'}, 'Leaf': set()})
+    assert graph.dangling() == {'A.get': ['Missing'], 'Pong': ['Gone']}
+    assert graph.cycles() == [['Node'], ['Ping', 'Pong']]
+
+
+def test_from_registry(caplog):
+    @swirl.restapi('/refgraph')
+    class RefGraphHandler(RequestHandler):
+        def post(self):
+            """Ref graph test
+
+            Request Body:
+                order (RefGraphOrder) -- The order
+
+            Response:
+                out ([RefGraphMissing]) -- Missing model
+            """
+
+    class RefGraphBase(object):
+        pass
+
+    @swirl.schema
+    class RefGraphOrder(RefGraphBase):
+        """Order
+
+        Properties:
+            items ([RefGraphOrder]) -- Sub orders
+        """
+
+    with caplog.at_level(logging.INFO, logger='tornado_swirl'):
+        snap = settings.freeze()
+    graph = RefGraph.from_registry(snap)
+    assert graph.operations['RefGraphHandler.post'] == {'RefGraphOrder', 'RefGraphMissing'}
+    assert graph.schemas['RefGraphOrder'] == {'RefGraphOrder', 'RefGraphBase'}
+    assert graph.dangling()['RefGraphHandler.post'] == ['RefGraphMissing']
+    assert ['RefGraphOrder'] in graph.cycles()
+    assert 'RefGraphMissing' in caplog.text
+    assert 'RefGraphBase' in caplog.text
+
+
+def test_none_response_is_not_a_reference():
+    @swirl.restapi('/refgraph-none')
+    class RefGraphNoneHandler(RequestHandler):
+        def delete(self):
+            """Delete it
+
+            Response:
+                out (None) -- Nothing
+            """
+
+    graph = RefGraph.from_registry(settings.snapshot())
+    assert graph.operations['RefGraphNoneHandler.delete'] == set()
+    assert 'RefGraphNoneHandler.delete' not in graph.dangling()
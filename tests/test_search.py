@@ -0,0 +1,74 @@
+#pylint: disable=all
+from tornado_swirl.docparser import parse_from_docstring
+from tornado_swirl.operations import Operation
+from tornado_swirl.search import SearchIndex, tokenize
+
+
+def _operation(op_id, method, path, doc):
+    return op_id, Operation(op_id, method, path, None, parse_from_docstring(doc))
+
+
+OPERATIONS = dict([
+    _operation('OrderHandler.get', 'get', '/orders/{order_id}', """Get an order
+
+        Returns the order with its line items.
+
+        Path Parameters:
+            order_id (int) -- The order ID
+
+        Tags:
+            orders
+        """),
+    _operation('OrderListHandler.get', 'get', '/orders', """List orders
+
+        Query Parameters:
+            customer (string) -- Only the orders of this customer
+
+        Tags:
+            orders
+        """),
+    _operation('CustomerHandler.get', 'get', '/customers/{cid}', """Get a customer
+
+        The customer placing orders.
+
+        Path Parameters:
+            cid (int) -- The customer ID
+        """),
+])
+
+
+def test_tokenize():
+    assert tokenize('OrderListHandler.get /orders/{order_id}') == [
+        'order', 'list', 'handler', 'get', 'orders', 'order', 'id']
+    assert tokenize(None) == []
+
+
+def test_search_ranking():
+    index = SearchIndex(OPERATIONS)
+    found = [op.operation_id for (op, _) in index.search('orders')]
+    assert found[:2] == ['OrderListHandler.get', 'OrderHandler.get']
+    assert found[-1] == 'CustomerHandler.get'  # only in its description
+    assert [op.operation_id for (op, _) in index.search('order id')][0] == 'OrderHandler.get'
+
+
+def test_search_prefix_and_all_terms():
+    index = SearchIndex(OPERATIONS)
+    assert [op.operation_id for (op, _) in index.search('cust get')] == [
+        'CustomerHandler.get', 'OrderListHandler.get']
+    assert index.search('cust line') == []
+    assert index.search('zzz') == []
+    assert index.search('') == []
+    assert len(index.search('get', limit=1)) == 1
+
+
+def test_built_search_index():
+    from collections import namedtuple
+    from tornado_swirl.cache import SpecCache
+
+    Registry = namedtuple('Registry', ['generation', 'operations'])
+    spec_cache = SpecCache()
+    registry = Registry(1, OPERATIONS)
+    assert spec_cache.built_search_index(registry) is None
+    index = spec_cache.search_index(registry)
+    assert spec_cache.built_search_index(registry) is index
+    assert spec_cache.built_search_index(Registry(2, OPERATIONS)) is None
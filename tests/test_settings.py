@@ -0,0 +1,183 @@
+#pylint: disable=all
+import threading
+
+import pytest
+
+import tornado_swirl.settings as settings
+import tornado_swirl.swagger as swirl
+from tornado.web import RequestHandler
+from tornado_swirl.builder import SpecBuilder, find_api
+
+
+def test_snapshot_is_cached_until_registry_changes():
+    snap = settings.freeze()
+    assert settings.snapshot() is snap
+
+    @swirl.restapi('/test-snapshot')
+    class Handler(RequestHandler):
+        def get(self):
+            """Snapshot test"""
+            pass
+
+    snap2 = settings.snapshot()
+    assert snap2 is not snap
+    assert snap2.generation > snap.generation
+    assert Handler in snap2.api_handlers
+    assert Handler not in snap.api_handlers
+
+
+def test_snapshot_is_immutable():
+    @swirl.schema
+    class SnapshotModel(object):
+        """Snapshot model
+
+        Properties:
+            name (string) -- Name
+        """
+
+    snap = settings.freeze()
+    assert isinstance(snap.routes, tuple)
+    assert isinstance(snap.api_handlers, tuple)
+    with pytest.raises(TypeError):
+        snap.schemas['Foo'] = object
+    with pytest.raises(TypeError):
+        snap.security_schemes['foo'] = object
+    assert snap.schemas['SnapshotModel'] is SnapshotModel
+
+
+def test_snapshot_survives_concurrent_registration():
+    snap = settings.freeze()
+    count = len(snap.schemas)
+
+    def register():
+        for i in range(50):
+            swirl.schema(type('ConcurrentModel%d' % i, (object,), {
+                '__doc__': 'Concurrent model\n\nProperties:\n    name (string) -- Name\n'}))
+
+    thread = threading.Thread(target=register)
+    thread.start()
+    names = [name for name in snap.schemas]
+    thread.join()
+
+    assert len(names) == count
+    assert len(settings.snapshot().schemas) >= count + 50
+
+
+def test_describe_changes_generation():
+    gen = settings.generation()
+    swirl.describe(title=settings.default_settings.get('title'),
+                   description=settings.default_settings.get('description'))
+    assert settings.generation() > gen
+
+
+def test_prefix_index():
+    from tornado_swirl._prefix_index import PrefixIndex
+    index = PrefixIndex(['/internal', '/debug/', 'myapp.admin'])
+    assert index.matches('/internal/health')
+    assert index.matches(r'^/debug/vars$')
+    assert not index.matches('/debugger')
+    assert index.matches('/internal')
+    assert index.matches(r'/internal/(?P<oid>\d+)$')
+    assert not index.matches('/internal-api/orders')
+    assert not index.matches('/internalize')
+    assert not index.matches('/api/internal')
+    assert index.matches(module='myapp.admin')
+    assert index.matches(module='myapp.admin.views')
+    assert not index.matches(module='myapp.administration')
+    assert not index.matches('/api', 'myapp')
+
+
+def test_excluded_namespaces_are_not_documented():
+    settings.default_settings['exclude_namespaces'] = ['/internal-test']
+    try:
+        @swirl.restapi('/internal-test/health')
+        class HealthHandler(RequestHandler):
+            def get(self):
+                """Health check"""
+                pass
+    finally:
+        settings.default_settings['exclude_namespaces'] = []
+
+    assert not hasattr(HealthHandler.get, 'path_spec')
+    assert HealthHandler not in settings.snapshot().api_handlers
+    assert ('/internal-test/health', HealthHandler, {}) in settings.api_routes()
+
+
+def test_excluded_subclass_of_documented_handler():
+    @swirl.restapi('/exclusion-users')
+    class ExclusionUsers(RequestHandler):
+        def get(self):
+            """List users"""
+
+    settings.default_settings['exclude_namespaces'] = ['/internal-exclusion']
+    try:
+        @swirl.restapi('/internal-exclusion/users')
+        class InternalExclusionUsers(ExclusionUsers):
+            pass
+    finally:
+        settings.default_settings['exclude_namespaces'] = []
+
+    snap = settings.snapshot()
+    assert ('/internal-exclusion/users', InternalExclusionUsers, {}) in settings.api_routes()
+    assert [route[1] for route in snap.routes if route[0].endswith('exclusion/users')] == []
+    assert 'ExclusionUsers.get' in snap.operations
+    assert 'InternalExclusionUsers.get' not in snap.operations
+    paths = [path for (path, _, _) in find_api(snap)]
+    assert '/exclusion-users' in paths and '/internal-exclusion/users' not in paths
+
+
+def test_operation_ids_of_same_named_handlers():
+    @swirl.restapi('/opid-public/users')
+    class OpIdUsersHandler(RequestHandler):
+        __module__ = 'opidapp.public'
+
+        def get(self):
+            """Public users"""
+
+    public = OpIdUsersHandler
+
+    @swirl.restapi('/opid-admin/users')
+    class OpIdUsersHandler(RequestHandler):
+        __module__ = 'opidapp.admin'
+
+        def get(self):
+            """Admin users"""
+
+    snap = settings.snapshot()
+    assert 'OpIdUsersHandler.get' not in snap.operations
+    assert snap.operations['opidapp.public.OpIdUsersHandler.get'].handler is public
+    assert snap.operations['opidapp.admin.OpIdUsersHandler.get'].path == '/opid-admin/users'
+
+    scoped = settings.RegistryView(['opidapp.public']).snapshot()
+    assert list(scoped.operations) == ['opidapp.public.OpIdUsersHandler.get']
+    doc = SpecBuilder(scoped).build()
+    assert doc['paths']['/opid-public/users']['get']['operationId'] == \
+        'opidapp.public.OpIdUsersHandler.get'
+
+
+def test_operation_ids_of_handler_routed_twice():
+    class OpIdTwiceHandler(RequestHandler):
+        def get(self):
+            """Twice"""
+
+    swirl.restapi('/opid-twice/a')(OpIdTwiceHandler)
+    swirl.restapi('/opid-twice/b')(OpIdTwiceHandler)
+    ids = sorted(op_id for op_id in settings.snapshot().operations if 'OpIdTwice' in op_id)
+    assert ids == [OpIdTwiceHandler.__module__ + '.OpIdTwiceHandler.get@/opid-twice/a',
+                   OpIdTwiceHandler.__module__ + '.OpIdTwiceHandler.get@/opid-twice/b']
+
+
+def test_late_exclude_namespaces_warns(caplog):
+    import logging
+
+    @swirl.restapi('/late-exclusion')
+    class LateExclusionHandler(RequestHandler):
+        def get(self):
+            """Late exclusion"""
+
+    try:
+        with caplog.at_level(logging.WARNING, logger='tornado_swirl'):
+            settings.update_settings(exclude_namespaces=['/late-exclusion'])
+    finally:
+        settings.default_settings['exclude_namespaces'] = []
+    assert 'exclude_namespaces changed after' in caplog.text
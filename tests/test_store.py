@@ -0,0 +1,189 @@
+#pylint: disable=all
+import json
+import os
+import tempfile
+
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import RequestHandler
+
+import tornado_swirl.settings as settings
+import tornado_swirl.swagger as swirl
+from tornado_swirl.cache import SpecCache, make_entry
+from tornado_swirl.store import SharedSpecStore
+
+
+def test_publish_and_share():
+    path = tempfile.mkdtemp()
+    worker1 = SharedSpecStore(path)
+    worker2 = SharedSpecStore(path)
+    key = ('a' * 40, 'title', '[]', False)
+
+    assert worker2.get(key) is None
+    entry = worker1.publish(key, make_entry(b'{"openapi": "3.0.0"}'))
+    assert isinstance(entry.body, memoryview)
+
+    shared = worker2.get(key)
+    assert bytes(shared.body) == b'{"openapi": "3.0.0"}'
+    assert shared.etag == make_entry(b'{"openapi": "3.0.0"}').etag
+    assert worker2.get(key) is shared
+    assert worker2.get(('b' * 40, 'title', '[]', False)) is None
+
+
+def test_corrupted_file_is_ignored():
+    path = tempfile.mkdtemp()
+    store = SharedSpecStore(path)
+    key = ('c' * 40, 'x')
+    with open(store._filename(key), 'wb') as spec_file:
+        spec_file.write(b'garbage')
+    assert store.get(key) is None
+
+
+def test_rotate():
+    path = tempfile.mkdtemp()
+    store = SharedSpecStore(path, keep=2)
+    for index in range(4):
+        store.publish((str(index) * 40,), make_entry(b'{}'))
+        os.utime(store._filename((str(index) * 40,)), ns=(index * 10**9, index * 10**9))
+    store.rotate()
+    assert sorted(os.listdir(path)) == sorted(
+        os.path.basename(store._filename((str(index) * 40,))) for index in (2, 3))
+
+
+def test_store_key_follows_content():
+    @swirl.restapi('/storekey')
+    class StoreKeyHandler(RequestHandler):
+        def get(self):
+            """Old summary"""
+
+    class NewStoreKeyHandler(RequestHandler):
+        def get(self):
+            """New summary"""
+    NewStoreKeyHandler.__name__ = NewStoreKeyHandler.__qualname__ = 'StoreKeyHandler'
+    NewStoreKeyHandler.get.path_spec = StoreKeyHandler.get.path_spec
+
+    snap = settings.snapshot()
+    # another release, whose registry happens to have the same generation
+    restarted = snap._replace(routes=tuple(
+        (route[0], NewStoreKeyHandler, route[2]) if route[1] is StoreKeyHandler else route
+        for route in snap.routes))
+    path = tempfile.mkdtemp()
+    key = (snap.generation, 'x')
+    old_key = SpecCache(store=SharedSpecStore(path)).store_key(snap, key)
+    new_key = SpecCache(store=SharedSpecStore(path)).store_key(restarted, key)
+    assert old_key[0] != new_key[0] and old_key[1:] == new_key[1:] == ('x',)
+    assert SpecCache().store_key(snap, key) is None
+
+
+def test_store_key_does_not_wait_on_builds(monkeypatch):
+    import threading
+    import tornado_swirl.cache as cache
+
+    started, release = threading.Event(), threading.Event()
+
+    class SlowBuilder(object):
+        def __init__(self, registry):
+            pass
+
+        def build(self):
+            started.set()
+            release.wait(5)
+            return {}
+
+    monkeypatch.setattr(cache, 'SpecBuilder', SlowBuilder)
+    snap = settings.snapshot()
+    spec_cache = SpecCache(store=SharedSpecStore(tempfile.mkdtemp()))
+    build = threading.Thread(target=spec_cache.document, args=(snap,))
+    build.start()
+    try:
+        assert started.wait(5)
+        lookup = threading.Thread(target=spec_cache.store_key, args=(snap, (snap.generation,)))
+        lookup.start()
+        lookup.join(2)
+        assert not lookup.is_alive()
+    finally:
+        release.set()
+        build.join()
+
+
+class TestSharedStoreEndpoint(AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.store_path = tempfile.mkdtemp()
+        settings.default_settings['spec_store_path'] = self.store_path
+        try:
+            return swirl.Application()
+        finally:
+            settings.default_settings['spec_store_path'] = None
+
+    @gen_test
+    def test_spec_is_published(self):
+        @swirl.restapi('/stored')
+        class StoredHandler(RequestHandler):
+            def get(self):
+                """Stored test"""
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert '/stored' in obj['paths']
+        assert [name for name in os.listdir(self.store_path) if name.endswith('.spec')]
+
+
+class TestSharedStoreDiff(AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.store_path = tempfile.mkdtemp()
+        settings.default_settings['spec_store_path'] = self.store_path
+        try:
+            return swirl.Application(namespaces=['/storediff'])
+        finally:
+            settings.default_settings['spec_store_path'] = None
+
+    @gen_test
+    def test_diff(self):
+        @swirl.restapi('/storediff/a')
+        class StoreDiffAHandler(RequestHandler):
+            def get(self):
+                """Store diff A"""
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        etag = response.headers['Etag']
+
+        @swirl.restapi('/storediff/b')
+        class StoreDiffBHandler(RequestHandler):
+            def get(self):
+                """Store diff B"""
+
+        for _ in range(2):  # built, then cached
+            response = yield self.http_client.fetch(
+                self.get_url('/swagger/spec/diff?since=' + etag))
+            assert response.headers['Content-Type'] == 'application/json-patch+json'
+            patch = json.loads(response.body.decode('utf-8'))
+            assert [op['path'] for op in patch] == ['/paths/~1storediff~1b']
+
+
+class TestSharedStoreTags(AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.store_path = tempfile.mkdtemp()
+        settings.default_settings['spec_store_path'] = self.store_path
+        try:
+            return swirl.Application(namespaces=['/storetags'])
+        finally:
+            settings.default_settings['spec_store_path'] = None
+
+    @gen_test
+    def test_tags(self):
+        @swirl.restapi('/storetags')
+        class StoreTagsHandler(RequestHandler):
+            def get(self):
+                """Store tags
+
+                Tags:
+                    stored
+                """
+
+        for _ in range(2):  # published, then mapped from the store
+            response = yield self.http_client.fetch(self.get_url('/swagger/tags'))
+            assert [tag['name'] for tag in json.loads(response.body.decode('utf-8'))] == ['stored']
+            for name, value in settings.default_settings.get('swagger_spec_headers', []):
+                assert value in response.headers.get_list(name)
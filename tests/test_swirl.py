@@ -6,6 +6,7 @@ from tornado_swirl import api_routes
 from tornado.testing import AsyncHTTPTestCase, gen_test
 from tornado.web import RequestHandler
 import json
+from urllib.parse import quote
 
 
 class TestSampleEndpoints(AsyncHTTPTestCase):
@@ -694,4 +695,753 @@ class TestSampleEndpoints(AsyncHTTPTestCase):
         assert obj['components']['securitySchemes']['test_basic']
         assert obj['components']['securitySchemes']['test_basic']['type'] == 'http'
         assert obj['components']['securitySchemes']['test_basic']['scheme'] == 'bearer'
-        assert obj['components']['securitySchemes']['test_basic']['bearerFormat'] == 'JWT'
\ No newline at end of file
+        assert obj['components']['securitySchemes']['test_basic']['bearerFormat'] == 'JWT'
+
+class TestScopedApplication(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/scoped-a'])
+
+    @gen_test
+    def test_namespaces(self):
+        @swirl.restapi('/scoped-a/items')
+        class ScopedA(RequestHandler):
+            def get(self):
+                """Scoped A
+
+                Response:
+                    out (ScopedItem) -- Item
+                """
+
+        @swirl.restapi('/scoped-b/items')
+        class ScopedB(RequestHandler):
+            def get(self):
+                """Scoped B
+
+                Response:
+                    out (ScopedOther) -- Other
+                """
+
+        @swirl.schema
+        class ScopedItem(object):
+            """Scoped item
+
+            Properties:
+                name (string) -- Name
+            """
+
+        @swirl.schema
+        class ScopedOther(object):
+            """Scoped other
+
+            Properties:
+                name (string) -- Name
+            """
+
+        self._app.add_handlers(r".*", api_routes(['/scoped-a']))
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        obj = json.loads(response.body.decode('utf-8'))
+
+        assert list(obj['paths']) == ['/scoped-a/items']
+        assert 'ScopedItem' in obj['components']['schemas']
+        assert 'ScopedOther' not in obj['components']['schemas']
+
+
+class TestSpecEtag(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application()
+
+    @gen_test
+    def test_not_modified(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        etag = response.headers['Etag']
+        assert etag
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'),
+                                                headers={'If-None-Match': etag},
+                                                raise_error=False)
+        assert response.code == 304
+
+
+class TestWarmup(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application()
+
+    @gen_test
+    def test_warmup(self):
+        import gc
+
+        @swirl.restapi('/warmup')
+        class WarmupHandler(RequestHandler):
+            def get(self):
+                """Warmup test"""
+
+        servers = [{'url': 'http://warm/', 'description': 'warm'}]
+        configured = settings.default_settings.get('servers')
+        settings.default_settings['servers'] = servers
+        try:
+            swirl.warmup(self._app)
+            if hasattr(gc, 'unfreeze'):
+                gc.unfreeze()
+            assert len(self._app.spec_cache.entries) == 1
+
+            entry = list(self._app.spec_cache.entries._items.values())[0]
+            obj = json.loads(entry.body.decode('utf-8'))
+            assert obj['servers'] == servers
+            assert '/warmup' in obj['paths']
+
+            response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+            assert response.headers['Etag'] == entry.etag
+            assert len(self._app.spec_cache.entries) == 1
+        finally:
+            settings.default_settings['servers'] = configured
+
+
+class TestSwaggerAssets(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application()
+
+    @gen_test
+    def test_gzip_and_etag(self):
+        import os
+        with open(os.path.join(settings.STATIC_PATH, 'swagger-ui.css'), 'rb') as css:
+            expected = css.read()
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/swagger-ui.css'),
+                                                headers={'Accept-Encoding': 'gzip'},
+                                                decompress_response=False)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Content-Type'] == 'text/css'
+        assert len(response.body) < len(expected)
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/swagger-ui.css'))
+        assert response.body == expected
+
+        etag = response.headers['Etag']
+        response = yield self.http_client.fetch(self.get_url('/swagger/swagger-ui.css'),
+                                                headers={'If-None-Match': etag},
+                                                raise_error=False)
+        assert response.code == 304
+
+    @gen_test
+    def test_identity_encoding(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/favicon-16x16.png'),
+                                                headers={'Accept-Encoding': 'identity'},
+                                                decompress_response=False)
+        assert response.code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['Content-Type'] == 'image/png'
+
+    @gen_test
+    def test_fingerprinted_urls(self):
+        import re
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        html = response.body.decode('utf-8')
+        match = re.search(r'src="\./(swagger-ui-bundle\.[0-9a-f]{12}\.js)"', html)
+        assert match
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/' + match.group(1)))
+        assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert response.body.startswith(b'!function')
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/swagger-ui-bundle.js'))
+        assert 'immutable' not in response.headers.get('Cache-Control', '')
+
+    @gen_test
+    def test_cached_index_page(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        assert response.headers['Content-Type'].startswith('text/html')
+        etag = response.headers['Etag']
+        response2 = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        assert response2.body == response.body
+        assert response2.headers['Etag'] == etag
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'),
+                                                headers={'If-None-Match': etag},
+                                                raise_error=False)
+        assert response.code == 304
+
+    @gen_test
+    def test_missing_asset(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/missing.js'),
+                                                raise_error=False)
+        assert response.code == 404
+
+
+class TestProductionAssets(AsyncHTTPTestCase):
+
+    def get_app(self):
+        settings.default_settings['asset_mode'] = 'production'
+        try:
+            return swirl.Application()
+        finally:
+            settings.default_settings['asset_mode'] = 'development'
+
+    @gen_test
+    def test_manifest_only(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/swagger-ui-bundle.js'))
+        assert response.code == 200
+        for name in ('swagger-ui.js', 'absolute-path.js', 'index.js', 'swagger-ui.css.map'):
+            response = yield self.http_client.fetch(self.get_url('/swagger/' + name),
+                                                    raise_error=False)
+            assert response.code == 404, name
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        assert response.code == 200
+
+
+class TestSpecOffload(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application()
+
+    def tearDown(self):
+        settings.default_settings['spec_offload_file'] = None
+        settings.default_settings['spec_offload_uri'] = None
+        super(TestSpecOffload, self).tearDown()
+
+    @gen_test
+    def test_x_accel_redirect(self):
+        import tempfile
+        spec_file = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        spec_file.write(b'{"openapi": "3.0.0"}')
+        spec_file.close()
+        settings.default_settings['spec_offload_file'] = spec_file.name
+        settings.default_settings['spec_offload_uri'] = '/internal/spec.json'
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        assert response.headers['X-Accel-Redirect'] == '/internal/spec.json'
+        assert response.body == b''
+        etag = response.headers['Etag']
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'),
+                                                headers={'If-None-Match': etag},
+                                                raise_error=False)
+        assert response.code == 304
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec?pretty=1'))
+        assert 'X-Accel-Redirect' not in response.headers
+        assert json.loads(response.body.decode('utf-8'))['openapi'] == '3.0.0'
+
+    @gen_test
+    def test_missing_offload_file(self):
+        settings.default_settings['spec_offload_file'] = '/nonexistent/spec.json'
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        assert 'X-Accel-Redirect' not in response.headers
+        assert response.body
+
+
+class TestTagSplit(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/tagsplit'])
+
+    @gen_test
+    def test_tag_subsets(self):
+        @swirl.restapi('/tagsplit/invoices')
+        class InvoicesHandler(RequestHandler):
+            def get(self):
+                """List invoices
+
+                Tags:
+                    billing
+
+                Response:
+                    out ([TagSplitInvoice]) -- Invoices
+                """
+
+        @swirl.restapi('/tagsplit/users')
+        class UsersHandler(RequestHandler):
+            def get(self):
+                """List users
+
+                Tags:
+                    users
+
+                Response:
+                    out ([TagSplitUser]) -- Users
+                """
+
+        @swirl.schema
+        class TagSplitInvoice(object):
+            """Invoice
+
+            Properties:
+                customer (TagSplitCustomer) -- Customer
+            """
+
+        @swirl.schema
+        class TagSplitCustomer(object):
+            """Customer
+
+            Properties:
+                name (string) -- Name
+            """
+
+        @swirl.schema
+        class TagSplitUser(object):
+            """User
+
+            Properties:
+                name (string) -- Name
+            """
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/tags'))
+        assert response.headers['Content-Type'] == settings.default_settings.get('json_mime_type')
+        tags = json.loads(response.body.decode('utf-8'))
+        assert [tag['name'] for tag in tags] == ['billing', 'users']
+        assert tags[0]['url'] == '/swagger/spec?tag=billing'
+        assert tags[0]['operations'] == 1
+
+        response = yield self.http_client.fetch(self.get_url(tags[0]['url']))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert list(obj['paths']) == ['/tagsplit/invoices']
+        assert sorted(obj['components']['schemas']) == ['TagSplitCustomer', 'TagSplitInvoice']
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec?tag=nope'),
+                                                raise_error=False)
+        assert response.code == 404
+
+    @gen_test
+    def test_split_ui(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        assert b'"/swagger/tags"' not in response.body
+        settings.default_settings['spec_split_by_tag'] = True
+        try:
+            response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        finally:
+            settings.default_settings['spec_split_by_tag'] = False
+        assert b'"/swagger/tags"' in response.body
+
+
+class TestPruneSchemas(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application()
+
+    def tearDown(self):
+        settings.default_settings['prune_schemas'] = False
+        super(TestPruneSchemas, self).tearDown()
+
+    @gen_test
+    def test_prune(self):
+        @swirl.restapi('/prune')
+        class PruneHandler(RequestHandler):
+            def get(self):
+                """Prune test
+
+                Response:
+                    out (PruneUsed) -- Used
+                """
+
+        @swirl.schema
+        class PruneUsed(object):
+            """Used
+
+            Properties:
+                name (string) -- Name
+            """
+
+        @swirl.schema
+        class PruneUnused(object):
+            """Unused
+
+            Properties:
+                name (string) -- Name
+            """
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert 'PruneUnused' in obj['components']['schemas']
+
+        settings.default_settings['prune_schemas'] = True
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert 'PruneUsed' in obj['components']['schemas']
+        assert 'PruneUnused' not in obj['components']['schemas']
+
+
+class TestCompactSpec(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/compact'])
+
+    @gen_test
+    def test_compact(self):
+        @swirl.restapi('/compact')
+        class CompactHandler(RequestHandler):
+            def get(self):
+                """Compact test
+
+                Response:
+                    out (None) -- Nothing
+                """
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        full = json.loads(response.body.decode('utf-8'))
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec?compact=1'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert response.headers['Etag']
+        assert len(response.body) < len(json.dumps(full).encode('utf-8'))
+
+        assert full['paths']['/compact']['get']['parameters'] == []
+        assert obj['paths']['/compact']['get'] == {
+            'operationId': 'CompactHandler.get', 'summary': 'Compact test',
+            'responses': {'200': {'description': 'Nothing'}}}
+
+
+class TestSpecProjection(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/projection'])
+
+    @gen_test
+    def test_projection(self):
+        @swirl.restapi(r'/projection/(?P<oid>\d+)')
+        class ProjectionHandler(RequestHandler):
+            def get(self, oid):
+                """Projection test
+
+                Path Parameters:
+                    oid (int) -- The ID
+                """
+
+        url = self.get_url('/swagger/spec?pointer=' +
+                           quote('#/paths/~1projection~1{oid}/get', safe=''))
+        response = yield self.http_client.fetch(url)
+        obj = json.loads(response.body.decode('utf-8'))
+        assert obj['operationId'] == 'ProjectionHandler.get'
+        etag = response.headers['Etag']
+        response = yield self.http_client.fetch(url, headers={'If-None-Match': etag},
+                                                raise_error=False)
+        assert response.code == 304
+
+        response = yield self.http_client.fetch(
+            self.get_url('/swagger/spec?fields=info,paths/~1projection~1{oid}/get/summary'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert sorted(obj) == ['info', 'paths']
+        assert obj['paths'] == {'/projection/{oid}': {'get': {'summary': 'Projection test'}}}
+        assert response.headers['Etag'] != etag
+
+        for pointer in ('/nope', 'paths'):
+            response = yield self.http_client.fetch(
+                self.get_url('/swagger/spec?pointer=' + pointer), raise_error=False)
+            assert response.code == 404
+
+    @gen_test
+    def test_projections_are_cached_apart(self):
+        @swirl.restapi(r'/projection/apart')
+        class ProjectionApartHandler(RequestHandler):
+            def get(self):
+                """Projection apart test"""
+
+        yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        spec_cache = self._app.spec_cache
+        assert len(spec_cache.entries) == 1
+        for index in range(20):
+            yield self.http_client.fetch(self.get_url('/swagger/spec?fields=info,x%d' % index))
+        assert len(spec_cache.entries) == 1
+        assert len(spec_cache._latest) == 1
+        assert len(spec_cache.projections) == 16
+
+
+class TestOperationSpec(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/opspec'])
+
+    @gen_test
+    def test_operation(self):
+        @swirl.restapi(r'/opspec/(?P<oid>\d+)')
+        class OpSpecHandler(RequestHandler):
+            def get(self, oid):
+                """Get one
+
+                Path Parameters:
+                    oid (int) -- The ID
+
+                Response:
+                    out (OpSpecOrder) -- The order
+                """
+
+            def delete(self, oid):
+                """Delete one
+
+                Path Parameters:
+                    oid (int) -- The ID
+                """
+
+        @swirl.schema
+        class OpSpecItem(object):
+            """Item
+
+            Properties:
+                name (string) -- Name
+            """
+
+        @swirl.schema
+        class OpSpecOrder(object):
+            """Order
+
+            Properties:
+                items ([OpSpecItem]) -- Items
+            """
+
+        @swirl.schema
+        class OpSpecOther(object):
+            """Other
+
+            Properties:
+                name (string) -- Name
+            """
+
+        op = settings.snapshot().operations['OpSpecHandler.get']
+        assert (op.method, op.path) == ('get', '/opspec/{oid}')
+
+        response = yield self.http_client.fetch(
+            self.get_url('/swagger/operations/OpSpecHandler.get'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert list(obj['paths']) == ['/opspec/{oid}']
+        assert list(obj['paths']['/opspec/{oid}']) == ['get']
+        assert sorted(obj['components']['schemas']) == ['OpSpecItem', 'OpSpecOrder']
+        assert response.headers['Etag']
+
+        response = yield self.http_client.fetch(
+            self.get_url('/swagger/operations/OpSpecHandler.delete'))
+        obj = json.loads(response.body.decode('utf-8'))
+        assert obj['components']['schemas'] == {}
+
+        response = yield self.http_client.fetch(
+            self.get_url('/swagger/operations/OpSpecHandler.put'), raise_error=False)
+        assert response.code == 404
+
+    @gen_test
+    def test_operations_are_cached_apart(self):
+        @swirl.restapi(r'/opspec/apart')
+        class OpSpecApartHandler(RequestHandler):
+            def get(self):
+                """Get apart"""
+
+        yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        spec_cache = self._app.spec_cache
+        assert len(spec_cache.entries) == 1
+        for pretty in ('', '?pretty=1', '?compact=1'):
+            yield self.http_client.fetch(
+                self.get_url('/swagger/operations/OpSpecApartHandler.get' + pretty))
+        assert len(spec_cache.entries) == 1
+        assert len(spec_cache.operations) == 3
+
+
+class TestOperationIndex(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/opindex'])
+
+    @gen_test
+    def test_index(self):
+        @swirl.restapi(r'/opindex/(?P<oid>\d+)')
+        class OpIndexHandler(RequestHandler):
+            def get(self, oid):
+                """Get one
+
+                Path Parameters:
+                    oid (int) -- The ID
+
+                Tags:
+                    orders
+                """
+
+            def delete(self, oid):
+                """Delete one
+
+                DEPRECATED
+
+                Path Parameters:
+                    oid (int) -- The ID
+                """
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/operations'))
+        assert response.headers['Content-Type'] == settings.default_settings.get('json_mime_type')
+        assert json.loads(response.body.decode('utf-8')) == [
+            ['OpIndexHandler.delete', 'delete', '/opindex/{oid}', 'Delete one', [], True],
+            ['OpIndexHandler.get', 'get', '/opindex/{oid}', 'Get one', ['orders'], False]]
+        etag = response.headers['Etag']
+        response = yield self.http_client.fetch(self.get_url('/swagger/operations'),
+                                                headers={'If-None-Match': etag},
+                                                raise_error=False)
+        assert response.code == 304
+
+
+class TestSearch(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/searchable'])
+
+    @gen_test
+    def test_search(self):
+        @swirl.restapi(r'/searchable/invoices')
+        class SearchInvoiceHandler(RequestHandler):
+            def get(self):
+                """List invoices
+
+                Query Parameters:
+                    paid (boolean) -- Only the paid invoices
+                """
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/search?q=invo+pai'))
+        assert response.headers['Content-Type'] == settings.default_settings.get('json_mime_type')
+        obj = json.loads(response.body.decode('utf-8'))
+        assert [row[:4] for row in obj] == [
+            ['SearchInvoiceHandler.get', 'get', '/searchable/invoices', 'List invoices']]
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/search?q=nothing'))
+        assert json.loads(response.body.decode('utf-8')) == []
+        response = yield self.http_client.fetch(self.get_url('/swagger/search'),
+                                                raise_error=False)
+        assert response.code == 400
+
+
+class TestSpecDiff(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return swirl.Application(namespaces=['/specdiff'])
+
+    @gen_test
+    def test_diff(self):
+        from tornado_swirl.jsonpatch import apply
+
+        @swirl.restapi('/specdiff/a')
+        class SpecDiffAHandler(RequestHandler):
+            def get(self):
+                """Spec diff A"""
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        base, etag = json.loads(response.body.decode('utf-8')), response.headers['Etag']
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec/diff?since=' + etag))
+        assert response.headers['Content-Type'] == 'application/json-patch+json'
+        assert json.loads(response.body.decode('utf-8')) == []
+
+        @swirl.restapi('/specdiff/b')
+        class SpecDiffBHandler(RequestHandler):
+            def get(self):
+                """Spec diff B"""
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec/diff?since=' + etag))
+        assert response.headers['Content-Type'] == 'application/json-patch+json'
+        patch = json.loads(response.body.decode('utf-8'))
+        assert [op['path'] for op in patch] == ['/paths/~1specdiff~1b']
+        current = response.headers['X-Spec-Etag']
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        assert response.headers['Etag'] == current
+        assert apply(base, patch) == json.loads(response.body.decode('utf-8'))
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec/diff?since=W/abc'))
+        assert response.headers['Content-Type'] == 'application/json'
+        assert json.loads(response.body.decode('utf-8')) == apply(base, patch)
+        spec_cache = self._app.spec_cache
+        assert len(spec_cache.patches) == 1
+        assert all(key[0] != 'diff' for key in spec_cache.entries._items)
+
+    @gen_test
+    def test_history_keeps_full_spec_only(self):
+        @swirl.restapi('/specdiff/history')
+        class SpecDiffHistoryHandler(RequestHandler):
+            def get(self):
+                """Spec diff history
+
+                Tags:
+                    history
+                """
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        for query in ('tag=history', 'compact=1', 'pretty=1', 'fields=info'):
+            yield self.http_client.fetch(self.get_url('/swagger/spec?' + query))
+        history = self._app.spec_cache.history
+        assert len(history) == 1
+        assert response.headers['Etag'] in history
+
+
+class TestLiveReload(AsyncHTTPTestCase):
+
+    def get_app(self):
+        settings.default_settings['spec_live_reload'] = True
+        return swirl.Application(namespaces=['/livereload'])
+
+    def tearDown(self):
+        settings.default_settings['spec_live_reload'] = False
+        super(TestLiveReload, self).tearDown()
+
+    @gen_test
+    def test_live(self):
+        from datetime import timedelta
+        from tornado import gen
+        from tornado.util import TimeoutError
+        from tornado.websocket import websocket_connect
+        import pytest
+
+        @swirl.restapi('/livereload/a')
+        class LiveReloadAHandler(RequestHandler):
+            def get(self):
+                """Live A"""
+
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec.html'))
+        assert b'"/swagger/live"' in response.body
+
+        conn = yield websocket_connect(self.get_url('/swagger/live').replace('http', 'ws'))
+        message = json.loads((yield conn.read_message()))
+        assert list(message['spec']['paths']) == ['/livereload/a']
+        etag = message['etag']
+
+        @swirl.restapi('/livereload/b')
+        class LiveReloadBHandler(RequestHandler):
+            def get(self):
+                """Live B"""
+
+        watcher = self._app.wildcard_router.named_rules[
+            settings.URL_SWAGGER_API_LIVE].target_kwargs['watcher']
+        watcher.poll()
+        message = json.loads((yield conn.read_message()))
+        assert message['etag'] != etag
+        assert [op['path'] for op in message['patch']] == ['/paths/~1livereload~1b']
+        conn.close()
+
+        conn = yield websocket_connect(
+            self.get_url('/swagger/live?since=' + message['etag']).replace('http', 'ws'))
+        with pytest.raises(TimeoutError):  # nothing changed since
+            yield gen.with_timeout(timedelta(seconds=0.2), conn.read_message())
+        conn.close()
+
+    @gen_test
+    def test_pushes_are_serialized(self):
+        from tornado import gen
+        from tornado.websocket import websocket_connect
+
+        conn = yield websocket_connect(self.get_url('/swagger/live').replace('http', 'ws'))
+        etag = json.loads((yield conn.read_message()))['etag']
+        watcher = self._app.wildcard_router.named_rules[
+            settings.URL_SWAGGER_API_LIVE].target_kwargs['watcher']
+        client = list(watcher.clients)[0]
+
+        @swirl.restapi('/livereload/first')
+        class LiveReloadFirstHandler(RequestHandler):
+            def get(self):
+                """Live first"""
+
+        first = gen.convert_yielded(client.push())
+        yield gen.moment  # the first push is building its changes
+
+        @swirl.restapi('/livereload/second')
+        class LiveReloadSecondHandler(RequestHandler):
+            def get(self):
+                """Live second"""
+
+        yield [first, client.push()]
+        message = json.loads((yield conn.read_message()))
+        assert message['etag'] != etag
+        assert [op['path'] for op in message['patch']] == ['/paths/~1livereload~1first']
+        message = json.loads((yield conn.read_message()))
+        assert [op['path'] for op in message['patch']] == ['/paths/~1livereload~1second']
+        conn.close()
@@ -2,6 +2,7 @@
 
 __author__ = 'serena'
 
-from tornado_swirl.settings import api_routes
-from tornado_swirl.swagger import Application, describe, restapi, schema, add_global_tag, add_security_scheme
+from tornado_swirl.settings import api_routes, freeze
+from tornado_swirl._intern import memory_report
+from tornado_swirl.swagger import Application, describe, restapi, schema, add_global_tag, add_security_scheme, warmup
 
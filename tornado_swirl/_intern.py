@@ -0,0 +1,57 @@
+"""Shared string pool for parsed docstring values.
+
+Names, type names and descriptions repeat a lot across a large API
+("Tenant identifier", "Page cursor", standard error texts, ...).  Every
+parsed value goes through the pool so the registry keeps a single copy
+of each distinct string.
+"""
+import sys
+
+
+class StringPool(object):
+    """Interns strings and keeps track of the memory saved by sharing."""
+
+    def __init__(self):
+        self._pool = {}
+        self.lookups = 0
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def intern(self, value):
+        """Returns the pooled copy of value."""
+        if not isinstance(value, str):
+            return value
+        self.lookups += 1
+        pooled = self._pool.setdefault(value, value)
+        if pooled is not value:
+            self.hits += 1
+            self.bytes_saved += sys.getsizeof(value)
+        return pooled
+
+    def report(self):
+        """Returns the pool memory report as a dict."""
+        return {
+            'strings': len(self._pool),
+            'bytes': sum(sys.getsizeof(val) for val in self._pool),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'bytes_saved': self.bytes_saved,
+        }
+
+    def clear(self):
+        """Empties the pool and resets the counters."""
+        self._pool.clear()
+        self.lookups = self.hits = self.bytes_saved = 0
+
+
+POOL = StringPool()
+
+
+def intern(value):
+    """Returns the shared copy of a string from the global pool."""
+    return POOL.intern(value)
+
+
+def memory_report():
+    """Returns the global string pool memory report."""
+    return POOL.report()
@@ -0,0 +1,73 @@
+"""Prefix index for URL and module namespaces."""
+
+_END = None
+
+# characters a URL namespace may be followed by: a path separator, the end
+# of the pattern or a regex group, repetition or alternation
+_URL_BOUNDARIES = '/$?([*+{|'
+
+
+class PrefixIndex(object):
+    """Prefix trie over namespaces.
+
+    Namespaces starting with '/' are URL prefixes and are indexed by
+    character; they match whole path segments, so ``/internal`` matches
+    ``/internal`` and ``/internal/health`` but not ``/internal-api``.  The
+    others are dotted module namespaces and are indexed by
+    module path component, so ``myapp.admin`` matches ``myapp.admin`` and
+    ``myapp.admin.views`` but not ``myapp.administration``.  A lookup costs
+    O(length of the URL or module name) whatever the number of namespaces.
+    """
+
+    def __init__(self, namespaces=()):
+        self.namespaces = tuple(namespaces)
+        self._urls = {}
+        self._modules = {}
+        for namespace in self.namespaces:
+            if namespace.startswith('/'):
+                self._insert(self._urls, namespace)
+            else:
+                self._insert(self._modules, namespace.split('.'))
+
+    def __bool__(self):
+        return bool(self.namespaces)
+
+    @staticmethod
+    def _insert(trie, keys):
+        node = trie
+        for key in keys:
+            node = node.setdefault(key, {})
+        node[_END] = True
+
+    @staticmethod
+    def _has_prefix_of(trie, keys):
+        node = trie
+        for key in keys:
+            node = node.get(key)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    @staticmethod
+    def _has_url_prefix_of(trie, url):
+        node = trie
+        for index, char in enumerate(url):
+            node = node.get(char)
+            if node is None:
+                return False
+            if _END in node and (char == '/' or index + 1 == len(url)
+                                 or url[index + 1] in _URL_BOUNDARIES):
+                return True
+        return False
+
+    def matches(self, url=None, module=None):
+        """Returns True if url or module falls under one of the namespaces."""
+        if url is not None and self._urls and \
+                self._has_url_prefix_of(self._urls, url.lstrip('^')):
+            return True
+        if module is not None and self._modules and \
+                self._has_prefix_of(self._modules, module.split('.')):
+            return True
+        return False
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""In-memory Swagger UI static assets."""
+import gzip
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import threading
+from collections import namedtuple
+
+ASSET_REGEX = r'.*\.(css|png|gif|js)'
+
+# the only assets index.html needs, served in the production asset mode
+PRODUCTION_ASSETS = (
+    'swagger-ui.css',
+    'swagger-ui-bundle.js',
+    'swagger-ui-standalone-preset.js',
+    'favicon-32x32.png',
+    'favicon-16x16.png',
+)
+
+_COMPRESSIBLE = ('.css', '.js', '.html', '.json', '.map', '.svg')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+Asset = namedtuple('Asset', ['name', 'body', 'gzip', 'etag', 'gzip_etag', 'content_type',
+                             'fingerprinted'])
+
+_BUNDLES = {}
+_BUNDLES_LOCK = threading.Lock()
+
+
+def gzip_bytes(body):
+    """Returns body gzipped, with a fixed mtime so the output is stable."""
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9, mtime=0) as gzfile:
+        gzfile.write(body)
+    return buf.getvalue()
+
+
+def fingerprint(name, digest):
+    """Returns name with the content digest before its extension."""
+    base, dot, ext = name.rpartition('.')
+    if not dot:
+        return name + '.' + digest[:12]
+    return base + '.' + digest[:12] + '.' + ext
+
+
+def make_asset(name, body):
+    """Returns the Asset of file name holding body."""
+    digest = hashlib.sha1(body).hexdigest()
+    compressed = gzip_bytes(body) if name.endswith(_COMPRESSIBLE) else None
+    if compressed is not None and len(compressed) >= len(body):
+        compressed = None
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    return Asset(name, body, compressed, '"%s"' % digest, '"%s-gz"' % digest,
+                 content_type, fingerprint(name, digest))
+
+
+class AssetBundle(object):
+    """Static assets read from a directory once and kept in memory.
+
+    Each asset keeps its gzip variant and the ETags of both, so serving
+    it never touches the filesystem nor compresses or hashes anything.
+    Assets are also reachable under their content fingerprinted names
+    (``swagger-ui.<digest>.css``), which never change content and can be
+    cached forever.
+    """
+
+    def __init__(self, path, pattern=ASSET_REGEX, names=None):
+        self.path = path
+        self.assets = {}
+        self.fingerprinted = {}
+        regex = re.compile(pattern + '$')
+        for name in sorted(names if names is not None else os.listdir(path)):
+            filename = os.path.join(path, name)
+            if regex.match(name) and os.path.isfile(filename):
+                with open(filename, 'rb') as asset_file:
+                    asset = make_asset(name, asset_file.read())
+                self.assets[name] = asset
+                self.fingerprinted[asset.fingerprinted] = asset
+
+    @classmethod
+    def load(cls, path, pattern=ASSET_REGEX, names=None):
+        """Returns the bundle of path, shared by every app of the process.
+
+        Arguments:
+            names -- optional manifest of the only files to load
+        """
+        key = (os.path.abspath(path), pattern, tuple(names) if names is not None else None)
+        with _BUNDLES_LOCK:
+            bundle = _BUNDLES.get(key)
+            if bundle is None:
+                bundle = _BUNDLES[key] = cls(path, pattern, names)
+            return bundle
+
+    def route_regex(self):
+        """Returns a route regex matching exactly the loaded asset names."""
+        names = sorted(self.assets) + sorted(self.fingerprinted)
+        return '(' + '|'.join(re.escape(name) for name in names) + ')'
+
+
+    def get(self, name):
+        """Returns the named Asset or None."""
+        return self.assets.get(name)
+
+    def get_fingerprinted(self, name):
+        """Returns the Asset of a fingerprinted name or None."""
+        return self.fingerprinted.get(name)
+
+    def url(self, name, base='./'):
+        """Returns the fingerprinted URL of asset name relative to base."""
+        asset = self.assets.get(name)
+        return base + (asset.fingerprinted if asset else name)
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""OpenAPI 3.0 spec document builder."""
+import hashlib
+import inspect
+import os
+
+from tornado_swirl import settings, swagger
+from tornado_swirl.operations import path_template
+from tornado_swirl.optimize import dedupe_components, hoist_schemas
+from tornado_swirl.refgraph import RefGraph, operation_specs
+
+
+# component sections only present through the $refs to them
+_REFERENCED_SECTIONS = ('schemas', 'parameters', 'responses')
+
+
+def settings_key():
+    """Returns the settings values the built document depends on."""
+    return tuple(settings.default_settings.get(name) for name in (
+        'title', 'description', 'api_version', 'json_mime_type', 'prune_schemas',
+        'dedupe_components', 'hoist_schemas_min_size'))
+
+
+def _code_digest():
+    """Returns the digest of the tornado_swirl sources, computed once."""
+    global _CODE_DIGEST  # pylint: disable=global-statement
+    if _CODE_DIGEST is None:
+        digest = hashlib.sha1()
+        package = os.path.dirname(os.path.abspath(__file__))
+        for root, dirs, files in os.walk(package):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    with open(os.path.join(root, name), 'rb') as source:
+                        digest.update(source.read())
+        _CODE_DIGEST = digest.hexdigest()
+    return _CODE_DIGEST
+
+
+_CODE_DIGEST = None
+
+
+def registry_digest(registry):
+    """Returns the digest of everything the spec of registry is built from.
+
+    Unlike the generation, which only counts the registrations of this
+    process, it identifies the spec content across processes and restarts:
+    the routes and their docstrings, the schemas, tags, security schemes,
+    the settings and the swirl version.
+    """
+    parts = [_code_digest(), repr(settings_key())]
+    for route in registry.routes:
+        handler = route[1]
+        parts.append('%s %s.%s' % (route[0], handler.__module__, handler.__qualname__))
+        parts.extend('%s %s' % (name, inspect.getdoc(getattr(handler, name)))
+                     for (name, _) in operation_specs(handler))
+    for name in sorted(registry.schemas):
+        cls = registry.schemas[name]
+        parts.append('%s %s' % (name, [(base.__module__, base.__qualname__,
+                                        inspect.getdoc(base)) for base in cls.__mro__]))
+    parts.extend(repr(sorted(tag.items())) for tag in registry.global_tags)
+    parts.extend('%s %r' % (name, registry.security_schemes[name].spec())
+                 for name in sorted(registry.security_schemes))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def iter_refs(obj):
+    """Yields every $ref value found in a document fragment."""
+    if isinstance(obj, dict):
+        for key, val in obj.items():
+            if key == '$ref' and isinstance(val, str):
+                yield val
+            else:
+                for ref in iter_refs(val):
+                    yield ref
+    elif isinstance(obj, list):
+        for val in obj:
+            for ref in iter_refs(val):
+                yield ref
+
+
+def reachable_components(doc, roots):
+    """Returns the set of (section, name) of the components of doc
+    referenced from roots, e.g. ('schemas', 'User').
+
+    Follows the references between components transitively.
+    """
+    components = doc.get('components', {})
+    prefix = '#/components/'
+    found = set()
+    pending = [ref for ref in iter_refs(roots)]
+    while pending:
+        ref = pending.pop()
+        if not ref.startswith(prefix):
+            continue
+        section, _, name = ref[len(prefix):].partition('/')
+        if (section, name) in found or name not in components.get(section, {}):
+            continue
+        found.add((section, name))
+        pending.extend(iter_refs(components[section][name]))
+    return found
+
+
+def doc_tags(doc):
+    """Returns [(tag name, operation count)] of the operations of doc."""
+    counts = {}
+    for operations in doc.get('paths', {}).values():
+        for operation in operations.values():
+            for tag in operation.get('tags', ()):
+                counts[tag] = counts.get(tag, 0) + 1
+    return sorted(counts.items())
+
+
+def tag_subset(doc, tag):
+    """Returns the part of doc documenting the operations tagged tag.
+
+    Keeps only the schemas, parameters and responses those operations
+    reach.  Returns None when no operation has the tag.
+    """
+    paths = {}
+    for path, operations in doc.get('paths', {}).items():
+        kept = {method: operation for (method, operation) in operations.items()
+                if tag in operation.get('tags', ())}
+        if kept:
+            paths[path] = kept
+    if not paths:
+        return None
+
+    subset = _paths_subset(doc, paths)
+    if 'tags' in doc:
+        subset['tags'] = [item for item in doc['tags'] if item.get('name') == tag]
+    return subset
+
+
+def operation_subset(doc, path, method):
+    """Returns the part of doc documenting one operation and the components
+    it references, transitively.  Returns None when doc lacks it."""
+    operation = doc.get('paths', {}).get(path, {}).get(method)
+    if operation is None:
+        return None
+    subset = _paths_subset(doc, {path: {method: operation}})
+    if 'tags' in doc:
+        subset['tags'] = [item for item in doc['tags']
+                          if item.get('name') in operation.get('tags', ())]
+    return subset
+
+
+def _paths_subset(doc, paths):
+    """Returns doc with only paths and the components they reach."""
+    subset = dict(doc, paths=paths)
+    components = doc.get('components')
+    if components:
+        found = reachable_components(doc, paths)
+        subset['components'] = dict(components, **{
+            section: {name: val for (name, val) in components[section].items()
+                      if (section, name) in found}
+            for section in _REFERENCED_SECTIONS if section in components})
+    return subset
+
+
+class SpecBuilder(object):
+    """Builds the OpenAPI document of a registry snapshot.
+
+    Works on an immutable RegistrySnapshot only and does not touch the
+    request, so it can safely run on a background thread.  The ``servers``
+    member is left empty, it depends on the request and is set when the
+    document is encoded.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._operation_ids = {(op.handler, op.method, op.path): op_id
+                               for (op_id, op) in registry.operations.items()}
+
+    def build(self):
+        """Returns the OpenAPI document as a dict."""
+        registry = self.registry
+        apis = find_api(registry)  # this is a generator
+        specs = {
+            'openapi': settings.SWAGGER_VERSION,
+            'info': {
+                'title': settings.default_settings.get("title"),
+                'description': settings.default_settings.get("description"),
+                'version': settings.default_settings.get("api_version"),
+            },
+            'servers': [],
+            'paths': {path: self.__get_api_spec(path, spec, operations)
+                      for path, spec, operations in apis},
+        }
+
+        if registry.global_tags:
+            specs['tags'] = [dict(tag) for tag in registry.global_tags]
+
+        schemas = registry.schemas
+        if settings.default_settings.get('prune_schemas'):
+            reachable = RefGraph.from_registry(registry).reachable()
+            schemas = {name: cls for (name, cls) in schemas.items() if name in reachable}
+        if schemas:
+            specs.update(
+                {
+                    "components": {
+                        "schemas": {
+                            name: self.__get_schema_spec(schemaCls)
+                            for (name, schemaCls) in schemas.items()
+                        }
+                    }
+                }
+            )
+
+        security_schemes = registry.security_schemes
+        if security_schemes:
+            components = specs.get("components") or {}
+            components['securitySchemes'] = {}
+
+            for name, scheme in security_schemes.items():
+                components['securitySchemes'][name] = scheme.spec()
+            #specs.update(components)
+
+        if settings.default_settings.get('dedupe_components'):
+            dedupe_components(specs)
+        min_size = settings.default_settings.get('hoist_schemas_min_size')
+        if min_size is not None:
+            hoist_schemas(specs, min_size)
+
+        return specs
+
+    def __get_schema_spec(self, cls):
+        specs = list(cls.schema_spec)
+        val = {}
+        if len(specs) > 1:
+            val = {"allOf": []}
+            while len(specs) > 1:
+                spec, specs = specs[0], specs[1:]
+                if isinstance(spec, swagger.Ref):
+                    val["allOf"].append({"$ref": spec.link})
+
+        if len(specs) == 1:
+            props = [(prop.name, self._prop_to_dict(prop), prop.required)
+                     for (_, prop) in specs[0].properties.items()]
+
+            required = [name for name, _, req in props if req]
+            obj = {"type": "object"}
+            obj['description'] = specs[0].description or specs[0].summary
+            if required:
+                obj.update({"required": required})
+
+            obj.update({
+                "properties": {
+                    name: d for name, d, r in props
+                }
+            })
+
+            if not val.get("allOf"):
+                val = obj
+            else:
+                val["allOf"].append(obj)
+
+            if specs[0].example:
+                val["example"] = specs[0].example
+            elif specs[0].examples:
+                val["examples"] = specs[0].examples
+
+        return val
+
+    def _prop_to_dict(self, prop):
+        schema = self.__get_type(prop)['schema']
+        if schema is not None:
+            schema.update(prop.kwargs)
+        if prop.description:
+            schema.update({"description": prop.description})
+        return schema
+
+    def __get_api_spec(self, path, spec, operations):
+        paths = {}
+        for api in operations:
+            paths[api[0]] = {
+                'operationId': self._operation_ids.get(
+                    (spec, api[0], path), str(spec.__name__) + "." + api[0]),
+                'summary': api[1].summary.strip(),
+                'description': api[1].description.strip(),
+                'parameters': self.__get_params(api[1]),
+            }
+            if api[1].deprecated:
+                paths[api[0]]['deprecated'] = True
+
+            if api[1].body_params:
+                paths[api[0]]["requestBody"] = self.__get_request_body(api[1])
+
+            paths[api[0]]["responses"] = self.__get_responses(api[1])
+
+            if api[1].tags:
+                paths[api[0]]["tags"] = self.__get_tags(api[1])
+
+            if api[1].security:
+                spec2 = self.__get_security_spec(api[1])
+                if spec2:
+                    paths[api[0]]["security"] = spec2
+
+        return paths
+
+    def __detect_content_from_type(self, val):  # -> (str, bool, str):
+        if val.type.name == "file":
+            return "file", False, val.type.contents
+        if val.type.name in self.registry.schemas:
+            return val.type.name, True, None
+        if val.type.name == 'object':
+            return 'object', True, None
+
+        return val.type.name, False, None
+
+    def __get_params(self, path_spec):
+        params = []
+        allps = sorted(path_spec.path_params.values(), key=lambda x: x.order) + \
+            sorted(path_spec.header_params.values(), key=lambda x: x.order) + \
+            sorted(path_spec.query_params.values(), key=lambda x: x.order) + \
+            sorted(path_spec.cookie_params.values(),
+                   key=lambda x: x.order)  # + \
+        # [path_spec.body_param] body param
+        for param in allps:
+            if param:
+                param_data = {
+                    "in": param.ptype,
+                    "name": param.name,
+                    "required": param.required,
+                    "description": str(param.description).strip()
+                }
+                param_data.update(self.__get_type(param))
+                params.append(param_data)
+        return params
+
+    def __get_tags(self, path_spec):
+        all_tags = sorted(path_spec.tags.values(), key=lambda x: x.order)
+        tag_list = []
+        for tag in all_tags:
+            if tag:
+                tag_list.append(tag.name)
+        return tag_list
+
+    def __get_security_spec(self, path_spec):
+        specs = []
+        for name, schemes in path_spec.security.items():
+            spec = {}
+            scheme = self.registry.security_schemes.get(name)
+            if not scheme:
+                continue
+            if scheme.type not in ('oauth2', 'openIdConnect'):
+                spec[name] = []
+            else:
+                pass  # TODO: support oauth2 and openIdConnect
+            specs.append(spec)
+        return specs
+
+    def __get_request_body(self, path_spec):
+        contents = {}
+        if path_spec.body_params:
+            files_detected = 0  # content = file:xxxx default text/plain
+            form_data_detected = 0  # application/x-www-form-urlencoded
+            models_detected = 0  # application/json or application/xml
+
+            for (_, val) in path_spec.body_params.items():
+                _, ismodel, ftype = self.__detect_content_from_type(val)
+                if ftype is not None:
+                    files_detected += 1
+                elif ismodel:
+                    models_detected += 1
+                else:
+                    form_data_detected += 1
+
+            ctype = ''
+            if form_data_detected > 0 and not files_detected and not models_detected:
+                ctype = 'application/x-www-form-urlencoded'
+                contents[ctype] = {
+                    "schema": {
+                        "properties": {
+                            spec.name: spec.type.schema
+                            for spec in path_spec.body_params.values()
+                        }
+                    }
+                }
+            elif files_detected == 1 and not form_data_detected and not models_detected:
+                entry = list(path_spec.body_params.values())[0]
+                contents[entry.type.contents] = {
+                    "schema": {
+                        "type": "string",
+                        "format": "binary"  # TODO: When to use byte/base64?
+                    }
+                }
+            elif (files_detected > 0 and
+                  (form_data_detected > 0 or models_detected > 0)) or \
+                    models_detected > 1:
+                contents["multipart/form-data"] = {
+                    "schema": {
+                        "properties": {
+                            spec.name: spec.type.schema
+                            for spec in path_spec.body_params.values()
+                        }
+                    }
+                }
+            elif models_detected == 1 and not files_detected and not form_data_detected:
+                params_entry = list(path_spec.body_params.values())[0]
+                file_type = settings.default_settings.get('json_mime_type')
+
+                contents[file_type] = {
+                    "schema":  params_entry.type.schema
+                }
+            else:
+                ctype = 'Unknown'
+
+        return {"content": contents}
+
+    def __get_responses(self, path_spec):
+        params = {}
+        allresps = sorted(path_spec.responses.values(), key=lambda x: x.name)
+        for param in allresps:
+            if param:
+                params[param.name] = {
+                    "description": param.description,
+                    "content":
+                        # should return default produces if none, otherwise detect from type
+                        self._detect_content(param)
+                }
+                # TODO: implement examples
+        return params
+
+    def _detect_content(self, param):
+        if param.type.name == "None":
+            return None
+
+        if param.type.name in ("integer", "number", "string", "boolean"):
+            return {"text/plain": {"schema": param.type.schema}}
+        return {settings.default_settings.get('json_mime_type'): {"schema": param.type.schema}}
+
+    def __get_type(self, param):
+        return {"schema": param.type.schema}
+
+
+def find_api(registry=None):
+    """Gets the API specs
+
+    Arguments:
+        registry -- the RegistrySnapshot to read, defaults to the latest one
+
+    Returns:
+        path, route_spec, opertiations:  Tuple
+            path -- the API endpoint URL
+            route_spec -- the Tornado Request Handler class
+            operations -- list of tuples containing (method name, PathSpec object)
+    """
+    registry = registry or settings.snapshot()
+    for route_spec in registry.routes:
+        spec = route_spec[1]
+        operations = operation_specs(spec)
+        if not operations:
+            continue
+        path = path_template(route_spec[0], operations)
+        if path is None:
+            continue
+
+        yield path, spec, operations
+
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""Spec caches."""
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from tornado.ioloop import IOLoop
+
+from tornado_swirl import settings
+from tornado_swirl.builder import SpecBuilder, registry_digest, settings_key
+from tornado_swirl.search import SearchIndex
+
+_EXECUTOR = None
+
+SpecEntry = namedtuple('SpecEntry', ['body', 'etag'])
+
+
+def default_executor():
+    """Returns the shared spec build executor.
+
+    A single worker thread: builds are queued rather than run side by side,
+    so concurrent variants reuse the document built first.
+    """
+    global _EXECUTOR  # pylint: disable=global-statement
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=1)
+    return _EXECUTOR
+
+
+def make_entry(body):
+    """Returns a SpecEntry for the encoded body with its strong ETag."""
+    return SpecEntry(body, '"%s"' % hashlib.sha1(body).hexdigest())
+
+
+class LRUCache(object):
+    """Small least recently used mapping."""
+
+    def __init__(self, size=16):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value for key."""
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return default
+            return self._items[key]
+
+    def set(self, key, value):
+        """Caches value for key, evicting the least recently used entry."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """Empties the cache."""
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+
+class SpecCache(object):
+    """Per-application cache of the built and encoded spec variants.
+
+    Builds run on an executor so they never block the IOLoop, and
+    concurrent requests for the same variant share one in-flight build.
+
+    Cache keys start with the registry generation.  When a variant is
+    given, the last good entry of that variant is also kept so it can be
+    served stale while the new generation is rebuilt in the background.
+
+    With a store.SharedSpecStore, entries fetched with their registry (see
+    store_key()) built by any worker process are shared with the others
+    instead of being rebuilt and held by each one.  The store is only
+    read and written on the executor.
+
+    The documents of the last history_size encoded specs are kept by ETag,
+    so clients can be sent the changes since the version they hold; the
+    encoded changes are cached in patches.
+
+    Projections of a spec (a JSON pointer or fields) and the documents of
+    single operations are cached apart, in projections and operations, so
+    clients asking for many of them cannot evict the full specs.
+    """
+
+    def __init__(self, size=16, executor=None, store=None, history_size=8):
+        self.entries = LRUCache(size)
+        self.projections = LRUCache(size)
+        self.operations = LRUCache(size)
+        self.history = LRUCache(history_size)
+        self.patches = LRUCache(history_size)
+        self.executor = executor
+        self.store = store
+        self._latest = LRUCache(size)
+        self._inflight = {}
+        self._document = (None, None)
+        self._search_index = (None, None)
+        self._digest = (None, None)
+        self._lock = threading.Lock()
+        self._digest_lock = threading.Lock()
+
+    def document(self, registry):
+        """Returns the OpenAPI document of registry, building it once.
+
+        Builds run outside of the lock: the first one published wins, so
+        readers of the other memoized values never wait on a build.
+        """
+        key = (registry.generation, settings_key())
+        doc_key, doc = self._document
+        if doc_key == key:
+            return doc
+        doc = SpecBuilder(registry).build()
+        with self._lock:
+            if self._document[0] != key:
+                self._document = (key, doc)
+            return self._document[1]
+
+    def search_index(self, registry):
+        """Returns the search.SearchIndex of registry, building it once."""
+        index = self.built_search_index(registry)
+        if index is not None:
+            return index
+        index = SearchIndex.from_registry(registry)
+        with self._lock:
+            if self._search_index[0] != registry.generation:
+                self._search_index = (registry.generation, index)
+            return self._search_index[1]
+
+    def built_search_index(self, registry):
+        """Returns the search.SearchIndex of registry if built already, else
+        None.  Never waits on a build, so it may run on the IOLoop."""
+        generation, index = self._search_index
+        return index if generation == registry.generation else None
+
+    def store_key(self, registry, key):
+        """Returns the store key of the cache key of a spec of registry, None
+        without a store.
+
+        The registry generation leading key is replaced by the content
+        digest of registry, which stays the same across processes.  The
+        digest reads the package sources: call it on the executor.
+        """
+        if self.store is None:
+            return None
+        memo_key = (registry.generation, settings_key())
+        with self._digest_lock:
+            digest_key, digest = self._digest
+            if digest_key != memo_key:
+                digest = registry_digest(registry)
+                self._digest = (memo_key, digest)
+        return (digest,) + tuple(key[1:])
+
+    async def fetch(self, key, producer, variant=None, max_staleness=None, registry=None,
+                    cache=None):
+        """Returns the SpecEntry cached for key.
+
+        On a miss producer() runs on the executor.  Only one producer runs
+        per key at a time, later callers wait on the same future.
+
+        Arguments:
+            variant -- key of the spec variant regardless of the generation
+            max_staleness -- seconds an outdated entry of variant may still
+                be served while key is rebuilt in the background, None to
+                always wait for the rebuild
+            registry -- RegistrySnapshot the entry is built from, to share
+                it with other workers through the store, None to keep it in
+                this process
+            cache -- LRUCache holding the entry, entries by default
+        """
+        cache = self.entries if cache is None else cache
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if variant is not None and max_staleness is not None:
+            entry = self._stale_entry(key, variant, max_staleness)
+            if entry is not None:
+                IOLoop.current().add_callback(self._revalidate, key, producer, variant,
+                                              registry)
+                return entry
+        return await self._build(key, producer, variant, registry, cache)
+
+    def _stale_entry(self, key, variant, max_staleness):
+        latest = self._latest.get(variant)
+        if latest is None or latest[0] == key:
+            return None
+        if latest[2] is None:
+            latest[2] = time.time()  # first seen outdated
+        if time.time() - latest[2] > max_staleness:
+            return None
+        return latest[1]
+
+    async def _revalidate(self, key, producer, variant, registry):
+        try:
+            await self._build(key, producer, variant, registry)
+        except Exception:  # pylint: disable=broad-except
+            # keep serving the last good entry
+            settings.LOGGER.exception('Cannot rebuild the spec in the background')
+
+    def _build(self, key, producer, variant, registry=None, cache=None):
+        future = self._inflight.get(key)
+        if future is None:
+            if registry is not None and self.store is not None:
+                producer = functools.partial(self._shared, registry, key, producer)
+            future = IOLoop.current().run_in_executor(
+                self.executor or default_executor(), producer)
+            self._inflight[key] = future
+            future.add_done_callback(lambda fut: self._done(key, variant, fut, cache))
+        return future
+
+    def _done(self, key, variant, future, cache=None):
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None \
+                and future.result() is not None:
+            if cache is None or cache is self.entries:
+                self.store_entry(key, future.result(), variant)
+            else:
+                cache.set(key, future.result())
+
+    def _shared(self, registry, key, producer):
+        store_key = self.store_key(registry, key)
+        entry = self.store.get(store_key)
+        if entry is not None:  # built by another worker
+            return entry
+        entry = producer()
+        if entry is None:  # nothing to share
+            return None
+        return self.store.publish(store_key, entry)
+
+    def store_entry(self, key, entry, variant=None):
+        """Caches entry for key and as the latest entry of variant."""
+        self.entries.set(key, entry)
+        if variant is not None:
+            self._latest.set(variant, [key, entry, None])
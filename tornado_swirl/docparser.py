@@ -10,6 +10,7 @@ import numbers
 import re
 
 from tornado_swirl.openapi.types import Type
+from tornado_swirl._intern import intern
 from tornado_swirl._parser_model import Param, PathSpec, SchemaSpec
 
 _QUERY_HEADERS = 'query headers'
@@ -82,9 +83,9 @@ def _process_security_params(fsm_obj, ptype):
         if not matcher:
             continue
         # get name
-        name = matcher.group("name")
+        name = intern(matcher.group("name"))
         spec = matcher.group("description")
-        params[name] = spec.split(',') if spec else []
+        params[name] = [intern(val) for val in spec.split(',')] if spec else []
     return params
 
 
@@ -103,7 +104,7 @@ def _process_params(fsm_obj, ptype, required_func=None):
         if not matcher:
             continue
         open_type = matcher.group('type')
-        param = Param(name=matcher.group('name'),
+        param = Param(name=intern(matcher.group('name')),
                       ptype=ptype,
                       required=required_func(str(matcher.group('required')
                                                  ).lower(), "required"),
@@ -111,7 +112,7 @@ def _process_params(fsm_obj, ptype, required_func=None):
                       )
         description = str(matcher.group('description')).strip()
         desc, kwargs = _get_description_props(description)
-        param.description = desc.strip()
+        param.description = intern(desc.strip())
         param.type = Type(open_type, **kwargs)
         params[param.name] = param
     return params
@@ -182,7 +183,7 @@ def _process_response(fsm_obj, **kwargs):
     res = _process_params(fsm_obj, "response")
     if res:
         item = list(res.values())[0]
-        item.name = cur_code
+        item.name = intern(cur_code)
         fsm_obj.spec.responses.update({
             cur_code: item
         })
@@ -452,4 +453,6 @@ def parse_from_docstring(docstring, spec='operation'):
     lines = docstring.splitlines(True)
     parser = _ParseFSM(FSM_MAP, lines, spec)
     parser.run()
+    parser.spec.summary = intern(parser.spec.summary)
+    parser.spec.description = intern(parser.spec.description)
     return parser.spec
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Static export of the Swagger UI and spec.
+
+Writes a self-contained directory that nginx or a CDN can serve without
+the Python process::
+
+    swirl-export myapp.handlers -o build/docs --server https://api.example.com
+
+The directory holds ``index.html`` (loading ``spec.json`` relatively), the
+fingerprinted Swagger UI assets and ``spec.json``, each with a ``.gz``
+sibling for precompressed serving (e.g. nginx ``gzip_static on``).
+"""
+import argparse
+import importlib
+import os
+import sys
+
+import tornado.template
+
+from tornado_swirl import settings
+from tornado_swirl.assets import PRODUCTION_ASSETS, AssetBundle, gzip_bytes
+from tornado_swirl.cache import SpecCache
+from tornado_swirl.views import configured_servers, encode_spec
+
+SPEC_FILENAME = 'spec.json'
+
+
+def _write(out_dir, name, body, compressed=None):
+    written = [os.path.join(out_dir, name)]
+    with open(written[0], 'wb') as out_file:
+        out_file.write(body)
+    if compressed is not None:
+        written.append(written[0] + '.gz')
+        with open(written[1], 'wb') as out_file:
+            out_file.write(compressed)
+    return written
+
+
+def export(out_dir, namespaces=None, servers=None):
+    """Writes the docs of the registered routes to out_dir.
+
+    Arguments:
+        out_dir -- the output directory, created if needed
+        namespaces -- optional module/URL namespaces to document
+        servers -- optional servers list, defaults to the described ones
+
+    Returns:
+        list of the written file paths
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    static_path = settings.default_settings.get('static_path')
+    bundle = AssetBundle.load(static_path, names=PRODUCTION_ASSETS)
+    written = []
+
+    for asset in bundle.assets.values():
+        written += _write(out_dir, asset.fingerprinted, asset.body, asset.gzip)
+
+    registry = settings.RegistryView(namespaces).snapshot()
+    entry = encode_spec(SpecCache(), registry, servers or configured_servers())
+    written += _write(out_dir, SPEC_FILENAME, entry.body, gzip_bytes(entry.body))
+
+    loader = tornado.template.Loader(static_path)
+    page = loader.load('index.html').generate(
+        spec_url=SPEC_FILENAME, tags_url='', live_url='',
+        asset_url=bundle.url)
+    written += _write(out_dir, 'index.html', page, gzip_bytes(page))
+    return written
+
+
+def main(argv=None):
+    """swirl-export command line entry point"""
+    parser = argparse.ArgumentParser(
+        description='Export the Swagger UI and OpenAPI spec to a static directory.')
+    parser.add_argument('modules', nargs='+',
+                        help='modules to import to register the API handlers')
+    parser.add_argument('-o', '--output', default='swagger',
+                        help='output directory (default: swagger)')
+    parser.add_argument('-n', '--namespace', action='append', dest='namespaces',
+                        help='only document this module namespace or URL prefix '
+                             '(repeatable)')
+    parser.add_argument('-s', '--server', action='append', dest='servers',
+                        help='server URL listed in the spec (repeatable)')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    for module in args.modules:
+        importlib.import_module(module)
+
+    servers = [{'url': url} for url in args.servers or ()]
+    for path in export(args.output, args.namespaces, servers):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,15 @@
 Swagger handler utils
 """
 
-from tornado.web import StaticFileHandler, URLSpec
+from tornado.web import URLSpec
 
-from tornado_swirl.views import (SwaggerApiHandler, #SwaggerResourcesHandler,
+from tornado_swirl.assets import ASSET_REGEX, PRODUCTION_ASSETS, AssetBundle
+from tornado_swirl.cache import LRUCache, SpecCache
+from tornado_swirl.views import (SpecWatcher, SwaggerApiHandler, #SwaggerResourcesHandler,
+                                 SwaggerAssetHandler, SwaggerLiveHandler,
+                                 SwaggerOperationHandler,
+                                 SwaggerOperationIndexHandler, SwaggerSearchHandler,
+                                 SwaggerSpecDiffHandler, SwaggerTagsHandler,
                                  SwaggerUIHandler)
 
 import tornado_swirl.settings as settings
@@ -13,21 +19,59 @@ import tornado_swirl.settings as settings
 __author__ = 'rduldulao'
 
 
-def swagger_handlers():
+def swagger_handlers(registry=None, spec_cache=None):
     """Returns the swagger UI handlers
 
+    Arguments:
+        registry -- the settings.RegistryView the spec is built from,
+            defaults to the whole registry
+        spec_cache -- the cache.SpecCache of the spec handler
+
     Returns:
         [(route, handler)] -- list of Tornado URLSpec
     """
 
+    registry = registry or settings.RegistryView()
+    spec_cache = spec_cache or SpecCache()
+    static_path = settings.default_settings.get('static_path')
+    if settings.default_settings.get('asset_mode') == 'production':
+        # only route the manifest assets, anything else 404s in the router
+        bundle = AssetBundle.load(static_path, names=PRODUCTION_ASSETS)
+        asset_route = bundle.route_regex()
+    else:
+        bundle = AssetBundle.load(static_path)
+        asset_route = '(' + ASSET_REGEX + ')'
     prefix = settings.default_settings.get('swagger_prefix', '/swagger')
     if prefix[-1] != '/':
         prefix += '/'
-    return [
+    handlers = [
         URLSpec(prefix + r'spec.html$', SwaggerUIHandler,
-                settings.default_settings, name=settings.URL_SWAGGER_API_DOCS),
+                dict(settings.default_settings, bundle=bundle, page_cache=LRUCache(8)),
+                name=settings.URL_SWAGGER_API_DOCS),
         URLSpec(prefix + r'spec$', SwaggerApiHandler,
+                {'registry': registry, 'spec_cache': spec_cache},
                 name=settings.URL_SWAGGER_API_SPEC),
-        (prefix + r'(.*\.(css|png|gif|js))', StaticFileHandler,
-         {'path': settings.default_settings.get('static_path')}),
+        URLSpec(prefix + r'spec/diff$', SwaggerSpecDiffHandler,
+                {'registry': registry, 'spec_cache': spec_cache},
+                name=settings.URL_SWAGGER_API_SPEC_DIFF),
+        URLSpec(prefix + r'tags$', SwaggerTagsHandler,
+                {'registry': registry, 'spec_cache': spec_cache},
+                name=settings.URL_SWAGGER_API_TAGS),
+        URLSpec(prefix + r'operations$', SwaggerOperationIndexHandler,
+                {'registry': registry, 'spec_cache': spec_cache},
+                name=settings.URL_SWAGGER_API_OPERATIONS),
+        URLSpec(prefix + r'operations/([^/]+)$', SwaggerOperationHandler,
+                {'registry': registry, 'spec_cache': spec_cache},
+                name=settings.URL_SWAGGER_API_OPERATION),
+        URLSpec(prefix + r'search$', SwaggerSearchHandler,
+                {'registry': registry, 'spec_cache': spec_cache},
+                name=settings.URL_SWAGGER_API_SEARCH),
+        (prefix + asset_route, SwaggerAssetHandler,
+         {'bundle': bundle}),
     ]
+    if settings.default_settings.get('spec_live_reload'):
+        handlers.insert(-1, URLSpec(
+            prefix + r'live$', SwaggerLiveHandler,
+            {'registry': registry, 'spec_cache': spec_cache, 'watcher': SpecWatcher(registry)},
+            name=settings.URL_SWAGGER_API_LIVE))
+    return handlers
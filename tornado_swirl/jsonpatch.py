@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""JSON Patch (RFC 6902) between spec documents."""
+import copy
+
+from tornado_swirl.jsonpointer import PointerError, parse, resolve, to_pointer
+
+
+def diff(src, dst):
+    """Returns the JSON Patch operations turning src into dst.
+
+    Uses add, remove and replace only.  Object members are compared in
+    sorted order, so the patch is the same for equal inputs.
+    """
+    ops = []
+    _diff(src, dst, [], ops)
+    return ops
+
+
+def _diff(src, dst, path, ops):
+    if type(src) is type(dst) and src == dst:  # pylint: disable=unidiomatic-typecheck
+        return
+    if isinstance(src, dict) and isinstance(dst, dict):
+        for key in sorted(src):
+            if key not in dst:
+                ops.append({'op': 'remove', 'path': to_pointer(path + [key])})
+        for key in sorted(dst):
+            if key not in src:
+                ops.append({'op': 'add', 'path': to_pointer(path + [key]), 'value': dst[key]})
+            else:
+                _diff(src[key], dst[key], path + [key], ops)
+    elif isinstance(src, list) and isinstance(dst, list):
+        _diff_list(src, dst, path, ops)
+    else:
+        ops.append({'op': 'replace', 'path': to_pointer(path), 'value': dst})
+
+
+def _diff_list(src, dst, path, ops):
+    # only the middle part between the common head and tail changes
+    head = 0
+    while head < min(len(src), len(dst)) and src[head] == dst[head]:
+        head += 1
+    tail = 0
+    while tail < min(len(src), len(dst)) - head and src[-1 - tail] == dst[-1 - tail]:
+        tail += 1
+    old, new = src[head:len(src) - tail], dst[head:len(dst) - tail]
+    for index in range(min(len(old), len(new))):
+        _diff(old[index], new[index], path + [head + index], ops)
+    for _ in range(len(old) - len(new)):
+        ops.append({'op': 'remove', 'path': to_pointer(path + [head + len(new)])})
+    for index in range(len(old), len(new)):
+        ops.append({'op': 'add', 'path': to_pointer(path + [head + index]),
+                    'value': new[index]})
+
+
+def apply(doc, patch):
+    """Returns a copy of doc with the add, remove and replace operations of
+    patch applied.
+
+    Raises:
+        PointerError -- when an operation path does not exist in doc
+    """
+    doc = copy.deepcopy(doc)
+    for operation in patch:
+        tokens = parse(operation['path'])
+        if not tokens:
+            if operation['op'] == 'remove':
+                raise PointerError('Cannot remove the whole document')
+            doc = copy.deepcopy(operation['value'])
+            continue
+        parent = resolve(doc, tokens[:-1])
+        key = tokens[-1]
+        if isinstance(parent, list):
+            key = len(parent) if key == '-' else int(key)
+            if operation['op'] != 'add' or key > len(parent):
+                resolve(parent, [str(key)])  # must exist
+        elif operation['op'] != 'add':
+            resolve(parent, [key])
+        if operation['op'] == 'remove':
+            del parent[key]
+        elif operation['op'] == 'add' and isinstance(parent, list):
+            parent.insert(key, copy.deepcopy(operation['value']))
+        elif operation['op'] in ('add', 'replace'):
+            parent[key] = copy.deepcopy(operation['value'])
+        else:
+            raise ValueError('Unsupported JSON Patch operation %s' % operation['op'])
+    return doc
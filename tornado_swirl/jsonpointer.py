@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""JSON Pointers (RFC 6901) into spec documents."""
+try:
+    from urllib.parse import unquote
+except ImportError:
+    from urllib import unquote
+
+
+class PointerError(ValueError):
+    """Raised for a malformed pointer or one not found in the document."""
+
+
+def escape(token):
+    """Returns a reference token escaped for a pointer."""
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def unescape(token):
+    """Returns the reference token of an escaped one."""
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def parse(pointer):
+    """Returns the list of reference tokens of pointer.
+
+    Also accepts the URI fragment form, e.g. ``#/paths/~1orders~1%7Bid%7D``.
+    """
+    if pointer.startswith('#'):
+        pointer = unquote(pointer[1:])
+    if not pointer:
+        return []
+    if not pointer.startswith('/'):
+        raise PointerError('Invalid JSON pointer %r' % pointer)
+    return [unescape(token) for token in pointer[1:].split('/')]
+
+
+def to_pointer(tokens):
+    """Returns the pointer made of reference tokens."""
+    return ''.join('/' + escape(str(token)) for token in tokens)
+
+
+def resolve(doc, tokens):
+    """Returns the value of doc at the reference tokens."""
+    for token in tokens:
+        if isinstance(doc, dict) and token in doc:
+            doc = doc[token]
+        elif isinstance(doc, list) and token.isdigit() and int(token) < len(doc) \
+                and (token == '0' or not token.startswith('0')):
+            doc = doc[int(token)]
+        else:
+            raise PointerError('%s not found' % to_pointer(tokens))
+    return doc
+
+
+def project(doc, fields):
+    """Returns the part of doc holding only fields, each a path of object
+    members separated by '/' (e.g. ``info`` or ``components/schemas/User``).
+
+    Fields missing from doc are left out.
+    """
+    projected = {}
+    for field in fields:
+        tokens = [unescape(token) for token in field.strip('/').split('/') if token]
+        source = doc
+        for token in tokens:
+            if not isinstance(source, dict) or token not in source:
+                break
+            source = source[token]
+        else:
+            if tokens:
+                target = projected
+                for token in tokens[:-1]:
+                    target = target.setdefault(token, {})
+                target[tokens[-1]] = source
+    return projected
@@ -3,6 +3,8 @@
 Use the Type class to determine the OpenAPI data type.
 
 """
+from tornado_swirl._intern import intern
+
 
 class SchemaMixin(object):
     """Schema mixin type for schema value"""
@@ -86,7 +88,7 @@ class FileType(object):
     """File type"""
     def __init__(self, contents, **kwargs):
         self.name = "file"
-        self.contents = contents
+        self.contents = intern(contents)
         self.kwargs = kwargs
 
     @property
@@ -197,16 +199,30 @@ class EnumType(SchemaMixin):
         self.name = "string"
         self.format = None
         vals = values.strip().split(",")
-        vals = [val.strip() for val in vals]
+        vals = [intern(val.strip()) for val in vals]
         self.kwargs = {"enum": vals}
 
 
 class ModelType(object):
     """Model type"""
     def __init__(self, name):
-        self.name = name
+        self.name = intern(name)
 
     @property
     def schema(self):
         """Model schema ref"""
         return {"$ref": "#/components/schemas/" + self.name}
+
+
+def model_refs(dtype):
+    """Yields the names of the model types referenced by dtype."""
+    if isinstance(dtype, ModelType):
+        if dtype.name != 'None':  # `out (None)` documents an empty response
+            yield dtype.name
+    elif isinstance(dtype, ArrayType):
+        for name in model_refs(dtype.items_type):
+            yield name
+    elif isinstance(dtype, CombineType):
+        for val in dtype.vals:
+            for name in model_refs(val):
+                yield name
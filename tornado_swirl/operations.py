@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Index of the documented operations, built at registration."""
+import re
+from collections import namedtuple
+
+from tornado.util import re_unescape
+
+from tornado_swirl.refgraph import operation_specs
+
+Operation = namedtuple('Operation', ['operation_id', 'method', 'path', 'handler', 'path_spec'])
+Operation.__doc__ = """A documented operation: the handler method of a route and its PathSpec."""
+
+
+def find_groups(url):
+    """Returns a tuple (reverse string, group count) for a url.
+
+    For example: Given the url pattern /([0-9]{4})/([a-z-]+)/, this method
+    would return ('/%s/%s/', 2).
+    """
+    regex = re.compile(url)
+    pattern = url
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    if pattern.endswith('$'):
+        pattern = pattern[:-1]
+
+    if regex.groups != pattern.count('('):
+        # The pattern is too complicated for our simplistic matching,
+        # so we can't support reversing it.
+        return None, None
+
+    pieces = []
+    for fragment in pattern.split('('):
+        if ')' in fragment:
+            paren_loc = fragment.index(')')
+            if paren_loc >= 0:
+                pieces.append('%s' + fragment[paren_loc + 1:])
+        else:
+            try:
+                unescaped_fragment = re_unescape(fragment)
+            except ValueError:
+                # If we can't unescape part of it, we can't
+                # reverse this url.
+                return (None, None)
+            pieces.append(unescaped_fragment)
+    return ''.join(pieces), regex.groups
+
+
+def path_template(url, operations):
+    """Returns the OpenAPI path of route url, e.g. ``/orders/{id}``, or None
+    when url is too complex to reverse.
+
+    Arguments:
+        operations -- the [(method name, PathSpec)] of the route handler
+    """
+    path, _ = find_groups(url)
+    if path is not None and operations:
+        # path params are shared by all ops of a route at registration
+        vals = operations[0][1].path_params.values()
+        path = path % tuple(['{%s}' % param.name for param in vals])
+    return path
+
+
+def route_operations(url, handler):
+    """Returns the [Operation] documented on the route of handler at url."""
+    operations = operation_specs(handler)
+    if not operations:
+        return []
+    try:
+        path = path_template(url, operations)
+    except TypeError:  # documented path params do not match the URL groups
+        return []
+    if path is None:
+        return []
+    return [Operation(handler.__name__ + '.' + name, name, path, handler, path_spec)
+            for (name, path_spec) in operations]
+
+
+def unique_operations(operations):
+    """Returns {operationId: Operation} of operations, making ids unique.
+
+    Operations sharing their ``ClassName.method`` id (e.g. same named
+    handlers of two modules) get module qualified ids, and path qualified
+    ones if that is not enough (one handler routed twice).
+    """
+    def group(ops, make_id):
+        groups = {}
+        for op in ops:
+            groups.setdefault(make_id(op), []).append(op)
+        return groups
+
+    unique = {}
+    for op_id, ops in group(operations, lambda op: op.operation_id).items():
+        if len(ops) == 1:
+            unique[op_id] = ops[0]
+            continue
+        qualified = group(ops, lambda op: op.handler.__module__ + '.' + op.operation_id)
+        for qualified_id, same in qualified.items():
+            if len(same) == 1:
+                unique[qualified_id] = same[0]._replace(operation_id=qualified_id)
+            else:
+                for op in same:
+                    path_id = qualified_id + '@' + op.path
+                    unique[path_id] = op._replace(operation_id=path_id)
+    return unique
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""Optimization passes over an assembled OpenAPI document.
+
+The passes are deterministic: the same document always gives the same
+output, so ETags stay stable across builds.
+"""
+import hashlib
+import json
+import re
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9\.\-_]')
+
+
+def digest(obj):
+    """Returns the content digest of a JSON-able object."""
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, separators=(',', ':'))
+                        .encode('utf-8')).hexdigest()
+
+
+def component_name(name):
+    """Returns name with the characters invalid in component names replaced."""
+    return _INVALID_NAME_CHARS.sub('_', str(name))
+
+
+def _assign_names(candidates):
+    """Returns {digest: component name} for {digest: base name}.
+
+    A base name used by a single candidate is kept as is, otherwise the
+    digest is appended to it, so names never depend on iteration order.
+    """
+    bases = {}
+    for key, base in candidates.items():
+        bases.setdefault(base, []).append(key)
+    names = {}
+    for base, keys in bases.items():
+        for key in keys:
+            names[key] = base if len(keys) == 1 else base + '.' + key[:8]
+    return names
+
+
+def _operations(doc):
+    for operations in doc.get('paths', {}).values():
+        for operation in operations.values():
+            if isinstance(operation, dict):
+                yield operation
+
+
+def dedupe_components(doc, min_count=2):
+    """Hoists the parameters and responses repeated across operations into
+    components/parameters and components/responses, in place.
+
+    Objects are compared by content; each use site gets a $ref instead.
+    Returns doc.
+    """
+    params = {}
+    responses = {}
+    for operation in _operations(doc):
+        for param in operation.get('parameters', ()):
+            if '$ref' not in param:
+                key = digest(param)
+                entry = params.setdefault(key, [param, 0])
+                entry[1] += 1
+        for code, response in operation.get('responses', {}).items():
+            if '$ref' not in response:
+                key = digest(response)
+                entry = responses.setdefault(key, [response, 0, code])
+                entry[1] += 1
+
+    params = {key: entry for (key, entry) in params.items() if entry[1] >= min_count}
+    responses = {key: entry for (key, entry) in responses.items() if entry[1] >= min_count}
+    if not params and not responses:
+        return doc
+
+    param_names = _assign_names({
+        key: component_name('%s.%s' % (entry[0].get('in'), entry[0].get('name')))
+        for (key, entry) in params.items()})
+    response_names = _assign_names({
+        key: component_name('Response%s' % entry[2]) for (key, entry) in responses.items()})
+
+    for operation in _operations(doc):
+        if 'parameters' in operation:
+            operation['parameters'] = [
+                {'$ref': '#/components/parameters/' + param_names[key]}
+                if key in param_names else param
+                for (key, param) in ((digest(param), param) for param in operation['parameters'])]
+        if 'responses' in operation:
+            for code, response in list(operation['responses'].items()):
+                key = digest(response)
+                if key in response_names:
+                    operation['responses'][code] = {
+                        '$ref': '#/components/responses/' + response_names[key]}
+
+    components = doc.setdefault('components', {})
+    if param_names:
+        components.setdefault('parameters', {}).update(
+            (param_names[key], params[key][0]) for key in sorted(param_names))
+    if response_names:
+        components.setdefault('responses', {}).update(
+            (response_names[key], responses[key][0]) for key in sorted(response_names))
+    return doc
+
+
+_SCHEMA_KINDS = (('enum', 'Enum'), ('oneOf', 'OneOf'), ('anyOf', 'AnyOf'), ('allOf', 'AllOf'),
+                 ('items', 'Array'))
+
+
+def _content_schemas(obj):
+    for media in (obj.get('content') or {}).values():
+        if isinstance(media, dict) and isinstance(media.get('schema'), dict):
+            yield media, 'schema'
+
+
+def _schema_slots(doc):
+    """Yields (container, key) of every schema of doc outside of
+    components/schemas, whose entries are named already."""
+    components = doc.get('components', {})
+    for operation in _operations(doc):
+        for param in operation.get('parameters', ()):
+            if isinstance(param.get('schema'), dict):
+                yield param, 'schema'
+        for slot in _content_schemas(operation.get('requestBody') or {}):
+            yield slot
+        for response in (operation.get('responses') or {}).values():
+            for slot in _content_schemas(response):
+                yield slot
+    for param in components.get('parameters', {}).values():
+        if isinstance(param.get('schema'), dict):
+            yield param, 'schema'
+    for response in components.get('responses', {}).values():
+        for slot in _content_schemas(response):
+            yield slot
+
+
+def _subschema_slots(schema):
+    """Yields (container, key) of the subschemas of schema."""
+    for name, prop in (schema.get('properties') or {}).items():
+        if isinstance(prop, dict):
+            yield schema['properties'], name
+    for key in ('items', 'additionalProperties', 'not'):
+        if isinstance(schema.get(key), dict):
+            yield schema, key
+    for key in ('allOf', 'oneOf', 'anyOf'):
+        if isinstance(schema.get(key), list):
+            for index, item in enumerate(schema[key]):
+                if isinstance(item, dict):
+                    yield schema[key], index
+
+
+def _walk_inline(doc, visit):
+    """Calls visit(container, key) on every inline schema of doc, outer
+    schemas first, and descends into a schema when visit returns True.
+
+    The entries of components/schemas are named already: only their
+    subschemas are visited.
+    """
+    def walk(container, key, inline):
+        schema = container[key]
+        if '$ref' in schema or (inline and not visit(container, key)):
+            return
+        for slot in _subschema_slots(schema):
+            walk(slot[0], slot[1], True)
+
+    for container, key in list(_schema_slots(doc)):
+        walk(container, key, True)
+    schemas = doc.get('components', {}).get('schemas', {})
+    for name in sorted(schemas):
+        walk(schemas, name, False)
+
+
+def hoisted_name(schema, key):
+    """Returns the generated component name of an inline schema of digest key."""
+    kind = next((label for (member, label) in _SCHEMA_KINDS if member in schema), 'Inline')
+    return kind + '.' + key[:12]
+
+
+def hoist_schemas(doc, min_size, min_count=2):
+    """Moves the inline schemas repeated in doc into components/schemas, in
+    place, and returns doc.
+
+    Schemas are compared by content.  Those used at least min_count times
+    whose canonical JSON is at least min_size bytes long are named after
+    their kind and digest (e.g. ``Enum.3f2a...``) and replaced by a $ref.
+    Passes repeat until no repeated schema is left, so a schema repeated
+    only inside hoisted ones is not hoisted needlessly.
+    """
+    while True:
+        found = {}
+
+        def count(container, key):
+            schema = container[key]
+            encoded = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+            if len(encoded) >= min_size:
+                found.setdefault(hashlib.sha1(encoded.encode('utf-8')).hexdigest(),
+                                 [schema, 0])[1] += 1
+            return True
+
+        _walk_inline(doc, count)
+        names = {key: hoisted_name(entry[0], key)
+                 for (key, entry) in found.items() if entry[1] >= min_count}
+        if not names:
+            return doc
+
+        hoisted = {}
+
+        def replace(container, key):
+            schema = container[key]
+            name = names.get(digest(schema))
+            if name is None:
+                return True
+            hoisted[name] = schema
+            container[key] = {'$ref': '#/components/schemas/' + name}
+            return False
+
+        _walk_inline(doc, replace)
+        schemas = doc.setdefault('components', {}).setdefault('schemas', {})
+        for name in sorted(hoisted):
+            schemas[name] = hoisted[name]
+
+
+# members kept verbatim, they hold user data rather than spec objects
+_LITERAL_MEMBERS = ('example', 'examples', 'enum', 'default')
+# members mapping names to spec objects
+_NAMED_MEMBERS = ('paths', 'properties', 'schemas', 'responses', 'parameters', 'content',
+                  'securitySchemes', 'headers', 'requestBodies', 'encoding', 'variables')
+# members that may be left out when empty
+_OPTIONAL_MEMBERS = ('parameters', 'tags', 'required', 'servers', 'components', 'schemas',
+                     'properties', 'securitySchemes', 'requestBodies')
+# members that may be left out when false, their default
+_FALSE_DEFAULTS = ('required', 'deprecated', 'allowEmptyValue', 'nullable', 'readOnly',
+                   'writeOnly', 'uniqueItems')
+
+
+def _omittable(key, val, response):
+    if val is None:
+        return True
+    if val is False:
+        return key in _FALSE_DEFAULTS
+    if val == '':
+        # a response object must have a description
+        return key in ('summary', 'description') and not (response and key == 'description')
+    if val == [] or val == {}:
+        return key in _OPTIONAL_MEMBERS
+    return False
+
+
+def _compact_value(val, response=False):
+    if isinstance(val, dict):
+        return _compact_object(val, response)
+    if isinstance(val, list):
+        return [_compact_value(item) for item in val]
+    return val
+
+
+def _compact_object(obj, response=False):
+    compacted = {}
+    for key, val in obj.items():
+        if key in _LITERAL_MEMBERS:
+            compacted[key] = val
+            continue
+        if key in _NAMED_MEMBERS and isinstance(val, dict):
+            val = {name: _compact_value(item, key == 'responses') for (name, item) in val.items()}
+        else:
+            val = _compact_value(val)
+        if not _omittable(key, val, response):
+            compacted[key] = val
+    return compacted
+
+
+def compact(doc):
+    """Returns a copy of doc without the empty and default valued members,
+    e.g. ``parameters: []``, blank descriptions or ``content: null``.
+
+    The result is still a valid OpenAPI document: required members, such
+    as the description of a response or the paths, are always kept.
+    """
+    return _compact_object(doc)
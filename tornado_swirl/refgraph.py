@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""$ref dependency graph of the registry."""
+import inspect
+
+from tornado_swirl.openapi.types import model_refs
+
+SCHEMA_REF_PREFIX = '#/components/schemas/'
+
+
+def operation_specs(handler):
+    """Returns the [(method name, PathSpec)] documented on handler."""
+    return [(name, member.path_spec) for (name, member) in inspect.getmembers(handler)
+            if hasattr(member, 'path_spec')]
+
+
+def path_spec_refs(path_spec):
+    """Yields the schema names referenced by an operation's params,
+    request body and responses."""
+    for params in (path_spec.path_params, path_spec.header_params,
+                   path_spec.query_params, path_spec.cookie_params,
+                   path_spec.body_params, path_spec.responses):
+        for param in params.values():
+            for name in model_refs(param.type):
+                yield name
+
+
+def schema_refs(cls):
+    """Yields the schema names referenced by a @schema class, through its
+    properties and its superclass Refs."""
+    for item in getattr(cls, 'schema_spec', []):
+        if hasattr(item, 'link'):  # superclass Ref
+            yield item.link[len(SCHEMA_REF_PREFIX):]
+        else:
+            for prop in item.properties.values():
+                for name in model_refs(prop.type):
+                    yield name
+
+
+class RefGraph(object):
+    """Graph of the $ref edges from operations to schemas and between
+    schemas, indexed from the parsed docstrings of a registry snapshot.
+
+    Operations are keyed by their operationId (see
+    operations.unique_operations).
+    """
+
+    def __init__(self, operations, schemas):
+        self.operations = operations
+        self.schemas = schemas
+
+    @classmethod
+    def from_registry(cls, registry):
+        """Returns the RefGraph of a RegistrySnapshot."""
+        operations = {op_id: set(path_spec_refs(op.path_spec))
+                      for (op_id, op) in registry.operations.items()}
+        schemas = {name: set(schema_refs(schema_cls))
+                   for (name, schema_cls) in registry.schemas.items()}
+        return cls(operations, schemas)
+
+    def reachable(self, operation_ids=None):
+        """Returns the set of schema names reachable from the operations.
+
+        Arguments:
+            operation_ids -- the operations to start from, defaults to all
+        """
+        if operation_ids is None:
+            operation_ids = self.operations.keys()
+        return self.closure(name for op_id in operation_ids
+                            for name in self.operations.get(op_id, ()))
+
+    def closure(self, names):
+        """Returns the set of known schemas in names and all they reference."""
+        pending = list(names)
+        found = set()
+        while pending:
+            name = pending.pop()
+            if name in found or name not in self.schemas:
+                continue
+            found.add(name)
+            pending.extend(self.schemas[name])
+        return found
+
+    def dangling(self):
+        """Returns {operationId or schema name: sorted unknown schema names}."""
+        missing = {}
+        for source, names in list(self.operations.items()) + list(self.schemas.items()):
+            unknown = sorted(name for name in names if name not in self.schemas)
+            if unknown:
+                missing[source] = unknown
+        return missing
+
+    def cycles(self):
+        """Returns the reference cycles between schemas as sorted name lists.
+
+        Recursive schemas are valid OpenAPI, but worth knowing about.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+
+        def strongconnect(node):  # Tarjan's strongly connected components
+            index[node] = lowlink[node] = len(index)
+            stack.append(node)
+            on_stack.add(node)
+            for succ in self.schemas.get(node, ()):
+                if succ not in self.schemas:
+                    continue
+                if succ not in index:
+                    strongconnect(succ)
+                    lowlink[node] = min(lowlink[node], lowlink[succ])
+                elif succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    succ = stack.pop()
+                    on_stack.discard(succ)
+                    component.append(succ)
+                    if succ == node:
+                        break
+                if len(component) > 1 or node in self.schemas[node]:
+                    cycles.append(sorted(component))
+
+        for node in sorted(self.schemas):
+            if node not in index:
+                strongconnect(node)
+        return sorted(cycles)
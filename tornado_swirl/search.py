@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Full-text search over the documented operations."""
+import bisect
+import re
+
+_WORDS = re.compile(r'[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])')
+
+# weight of a match in each indexed field
+FIELD_WEIGHTS = (
+    ('path', 3.0),
+    ('summary', 3.0),
+    ('operation_id', 2.0),
+    ('tags', 2.0),
+    ('params', 2.0),
+    ('description', 1.0),
+)
+
+# share of the weight a prefix (rather than whole word) match scores
+PREFIX_MATCH = 0.5
+
+
+def tokenize(text):
+    """Returns the lower case words of text, splitting camelCase words."""
+    return [word.lower() for word in _WORDS.findall(text or '')]
+
+
+def _fields(operation):
+    path_spec = operation.path_spec
+    params = [name for params in (path_spec.path_params, path_spec.header_params,
+                                  path_spec.query_params, path_spec.cookie_params,
+                                  path_spec.body_params)
+              for name in params]
+    return {
+        'path': operation.path,
+        'summary': path_spec.summary,
+        'operation_id': operation.operation_id,
+        'tags': ' '.join(tag.name for tag in path_spec.tags.values() if tag),
+        'params': ' '.join(params),
+        'description': path_spec.description,
+    }
+
+
+class SearchIndex(object):
+    """Inverted index of the words of the operations of a registry snapshot.
+
+    Covers paths, summaries, operationIds, tags, parameter names and
+    descriptions.  Query words match indexed words they are a prefix of;
+    every query word has to match for an operation to be found.
+    """
+
+    def __init__(self, operations):
+        self.operations = dict(operations)
+        self.postings = {}  # word -> {operationId: score}
+        for op_id, operation in self.operations.items():
+            scores = {}
+            fields = _fields(operation)
+            for field, weight in FIELD_WEIGHTS:
+                for word in set(tokenize(fields[field])):
+                    scores[word] = scores.get(word, 0.0) + weight
+            for word, score in scores.items():
+                self.postings.setdefault(word, {})[op_id] = score
+        self.words = sorted(self.postings)
+
+    @classmethod
+    def from_registry(cls, registry):
+        """Returns the SearchIndex of a RegistrySnapshot."""
+        return cls(registry.operations)
+
+    def _matches(self, term):
+        """Returns {operationId: score} of the operations matching term."""
+        found = {}
+        index = bisect.bisect_left(self.words, term)
+        while index < len(self.words) and self.words[index].startswith(term):
+            word = self.words[index]
+            factor = 1.0 if word == term else PREFIX_MATCH
+            for op_id, score in self.postings[word].items():
+                found[op_id] = max(found.get(op_id, 0.0), score * factor)
+            index += 1
+        return found
+
+    def search(self, query, limit=20):
+        """Returns the [(operations.Operation, score)] matching query, best
+        first."""
+        scores = None
+        for term in set(tokenize(query)):
+            matches = self._matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {op_id: score + matches[op_id]
+                          for (op_id, score) in scores.items() if op_id in matches}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.operations[op_id], score) for (op_id, score) in ranked[:limit]]
@@ -1,14 +1,30 @@
 # -*- coding: utf-8 -*-
 """Swirl Settings module."""
+import logging
 import os.path
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from tornado_swirl._prefix_index import PrefixIndex
+from tornado_swirl.operations import route_operations, unique_operations
+from tornado_swirl.refgraph import RefGraph
 
 __author__ = 'rduldulao'
 
+LOGGER = logging.getLogger('tornado_swirl')
+
 SWAGGER_VERSION = '3.0.0'
 
 URL_SWAGGER_API_DOCS = 'swagger-api-docs'
 URL_SWAGGER_API_LIST = 'swagger-api-list'
 URL_SWAGGER_API_SPEC = 'swagger-api-spec'
+URL_SWAGGER_API_TAGS = 'swagger-api-tags'
+URL_SWAGGER_API_OPERATION = 'swagger-api-operation'
+URL_SWAGGER_API_OPERATIONS = 'swagger-api-operations'
+URL_SWAGGER_API_SEARCH = 'swagger-api-search'
+URL_SWAGGER_API_SPEC_DIFF = 'swagger-api-spec-diff'
+URL_SWAGGER_API_LIVE = 'swagger-api-live'
 
 STATIC_PATH = os.path.join(os.path.dirname(os.path.normpath(__file__)), 'static')
 
@@ -30,15 +46,187 @@ default_settings = {
         ('Pragma', 'no-cache'),
     ],
     'json_mime_type': 'application/json',
+    'spec_max_staleness': None,  # seconds an outdated spec may be served while rebuilt
+    'spec_store_path': None,  # directory of the spec store shared by workers
+    'asset_mode': 'development',  # 'production' only serves the assets index.html needs
+    'spec_offload_file': None,  # prebuilt spec file served by the front proxy when it exists
+    'spec_offload_header': 'X-Accel-Redirect',  # or 'X-Sendfile'
+    'spec_offload_uri': None,  # header value, defaults to spec_offload_file
+    'spec_split_by_tag': False,  # Swagger UI loads one tag's spec at a time
+    'prune_schemas': False,  # drop the schemas no operation references
+    'dedupe_components': False,  # hoist repeated parameters and responses into components
+    'hoist_schemas_min_size': None,  # bytes from which repeated inline schemas are hoisted
+    'spec_history_size': 8,  # spec versions kept to answer /spec/diff with a patch
+    'spec_live_reload': False,  # development: Swagger UI follows the spec changes live
 }
 
 class SwirlVars(object):
     """Container for swirl handler vars"""
     SCHEMAS = dict()
     ROUTES = []
+    DOCUMENTED_ROUTES = []
     API_HANDLERS = []
     GLOBAL_TAGS = []
     SECURITY_SCHEMES =  {}
+    OPERATIONS = []
+
+    GENERATION = 0
+    SNAPSHOT = None
+    LOCK = threading.RLock()
+    EXCLUDED = None
+
+
+RegistrySnapshot = namedtuple('RegistrySnapshot', [
+    'generation', 'routes', 'api_handlers', 'schemas', 'global_tags', 'security_schemes',
+    'operations'])
+RegistrySnapshot.__doc__ = """Immutable, consistent view of the swirl registry.
+
+Readers (spec builds, possibly on background threads) work on a snapshot
+so registrations happening meanwhile never change what they iterate.
+"""
+
+
+def _changed():
+    """Marks the registry as changed. Caller must hold SwirlVars.LOCK."""
+    SwirlVars.GENERATION += 1
+    SwirlVars.SNAPSHOT = None
+
+
+def freeze():
+    """Publishes the current registry as an immutable snapshot and returns it.
+
+    Also logs the dangling and circular schema references of the snapshot.
+    """
+    snap = _publish()
+    dangling, cycles = check_refs(snap)
+    for source, names in sorted(dangling.items()):
+        LOGGER.warning('%s references unknown schema(s): %s', source, ', '.join(names))
+    for cycle in cycles:
+        LOGGER.info('circular schema references: %s', ', '.join(cycle))
+    for op_id, operation in sorted(snap.operations.items()):
+        if op_id != operation.handler.__name__ + '.' + operation.method:
+            LOGGER.info('operationId of %s %s is %s, its class name is not unique',
+                        operation.method, operation.path, op_id)
+    return snap
+
+
+def _publish():
+    with SwirlVars.LOCK:
+        snap = SwirlVars.SNAPSHOT
+        if snap is None:
+            snap = RegistrySnapshot(
+                generation=SwirlVars.GENERATION,
+                routes=tuple((path, handler, MappingProxyType(dict(kwargs)))
+                             for (path, handler, kwargs) in SwirlVars.DOCUMENTED_ROUTES),
+                api_handlers=tuple(SwirlVars.API_HANDLERS),
+                schemas=MappingProxyType(dict(SwirlVars.SCHEMAS)),
+                global_tags=tuple(MappingProxyType(dict(tag))
+                                  for tag in SwirlVars.GLOBAL_TAGS),
+                security_schemes=MappingProxyType(dict(SwirlVars.SECURITY_SCHEMES)),
+                operations=MappingProxyType(unique_operations(SwirlVars.OPERATIONS)),
+            )
+            SwirlVars.SNAPSHOT = snap
+        return snap
+
+
+def snapshot():
+    """Returns the latest published registry snapshot.
+
+    Lock-free when the registry did not change since the last freeze().
+    """
+    snap = SwirlVars.SNAPSHOT
+    if snap is not None and snap.generation == SwirlVars.GENERATION:
+        return snap
+    return _publish()
+
+
+def is_excluded(url, module=None):
+    """Returns True if url or module is listed in exclude_namespaces."""
+    namespaces = tuple(default_settings.get('exclude_namespaces') or ())
+    index = SwirlVars.EXCLUDED
+    if index is None or index.namespaces != namespaces:
+        index = SwirlVars.EXCLUDED = PrefixIndex(namespaces)
+    return index.matches(url, module)
+
+
+def select(snap, namespaces):
+    """Returns the part of snapshot snap that belongs to namespaces.
+
+    Keeps the routes whose URL or handler module is in namespaces, the
+    schemas whose module is in namespaces and every schema referenced by
+    the kept routes and schemas.
+
+    Arguments:
+        namespaces -- list of namespaces or a PrefixIndex
+    """
+    if not isinstance(namespaces, PrefixIndex):
+        namespaces = PrefixIndex(namespaces)
+    routes = tuple(route for route in snap.routes
+                   if namespaces.matches(route[0], route[1].__module__))
+    handlers = set(route[1] for route in routes)
+    operations = {op_id: op for (op_id, op) in snap.operations.items() if op.handler in handlers}
+    graph = RefGraph.from_registry(snap)
+    names = graph.reachable(operations)
+    names |= graph.closure(name for (name, cls) in snap.schemas.items()
+                           if namespaces.matches(module=cls.__module__))
+
+    return snap._replace(
+        routes=routes,
+        api_handlers=tuple(cls for cls in snap.api_handlers if cls in handlers),
+        schemas=MappingProxyType({name: cls for (name, cls) in snap.schemas.items()
+                                  if name in names}),
+        operations=MappingProxyType(operations),
+    )
+
+
+def check_refs(snap=None):
+    """Returns (dangling, cycles) of the $ref graph of a snapshot.
+
+    See refgraph.RefGraph.dangling() and refgraph.RefGraph.cycles().
+    """
+    graph = RefGraph.from_registry(snap or snapshot())
+    return graph.dangling(), graph.cycles()
+
+
+class RegistryView(object):
+    """Registry scoped to a set of module or URL namespaces.
+
+    Each swirl Application reads its routes and schemas through its own
+    view, so its spec only holds what belongs to it.
+    """
+
+    def __init__(self, namespaces=None):
+        self.namespaces = PrefixIndex(namespaces or ())
+        self._snapshot = None
+
+    def snapshot(self):
+        """Returns the scoped snapshot of the latest registry generation."""
+        snap = snapshot()
+        if not self.namespaces:
+            return snap
+        scoped = self._snapshot
+        if scoped is None or scoped.generation != snap.generation:
+            scoped = self._snapshot = select(snap, self.namespaces)
+        return scoped
+
+
+def generation():
+    """Returns the current registry generation number."""
+    return SwirlVars.GENERATION
+
+
+def update_settings(**kwargs):
+    """Updates default_settings and marks the registry as changed."""
+    with SwirlVars.LOCK:
+        if SwirlVars.ROUTES and 'exclude_namespaces' in kwargs and \
+                list(kwargs['exclude_namespaces'] or ()) != \
+                list(default_settings.get('exclude_namespaces') or ()):
+            LOGGER.warning('exclude_namespaces changed after %d route(s) were registered, '
+                           'it only applies to the routes registered later',
+                           len(SwirlVars.ROUTES))
+        default_settings.update(kwargs)
+        _changed()
+
 
 def get_api_handlers():
     """Returns REST API handlers"""
@@ -52,21 +240,46 @@ def add_global_tag(name, description=None, url=None):
 
     if url:
         tag['externalDocs'] = {'url': url}
-    SwirlVars.GLOBAL_TAGS.append(tag)
+    with SwirlVars.LOCK:
+        SwirlVars.GLOBAL_TAGS.append(tag)
+        _changed()
 
 def add_security_scheme(name, scheme):
-    SwirlVars.SECURITY_SCHEMES[name] = scheme
+    with SwirlVars.LOCK:
+        SwirlVars.SECURITY_SCHEMES[name] = scheme
+        _changed()
 
 def add_api_handler(cls):
     """Adds a REST API handler class"""
-    SwirlVars.API_HANDLERS.append(cls)
+    with SwirlVars.LOCK:
+        SwirlVars.API_HANDLERS.append(cls)
+        _changed()
+
+def add_route(path, handler, documented=True, **kwargs):
+    """Add a REST API route and index its documented operations.
+
+    Arguments:
+        documented -- False to only route it, e.g. under exclude_namespaces,
+            even if its handler inherits documented methods
+    """
+    operations = route_operations(path, handler) if documented else []
+    with SwirlVars.LOCK:
+        SwirlVars.ROUTES.append((path, handler, kwargs))
+        if documented:
+            SwirlVars.DOCUMENTED_ROUTES.append((path, handler, kwargs))
+            SwirlVars.OPERATIONS.extend(operations)
+        _changed()
 
-def add_route(path, handler, **kwargs):
-    """Add a REST API route."""
-    SwirlVars.ROUTES.append((path, handler, kwargs))
+def api_routes(namespaces=None):
+    """Return all registered REST API routes via @restapi decorator
 
-def api_routes():
-    """Return all registered REST API routes via @restapi decorator"""
+    Arguments:
+        namespaces -- optional module/URL namespaces to pick the routes from
+    """
+    if namespaces:
+        index = PrefixIndex(namespaces)
+        return [route for route in SwirlVars.ROUTES
+                if index.matches(route[0], route[1].__module__)]
     return SwirlVars.ROUTES
 
 def get_schemas():
@@ -79,4 +292,6 @@ def is_defined_schema(name):
 
 def add_schema(name, cls):
     """Add a schema"""
-    SwirlVars.SCHEMAS[name] = cls
+    with SwirlVars.LOCK:
+        SwirlVars.SCHEMAS[name] = cls
+        _changed()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Spec store shared by worker processes.
+
+The first worker that encodes a spec variant publishes it to a file in the
+store directory.  The other workers mmap that file and serve the mapped
+pages, so the encoded spec is held once in the OS page cache however many
+workers run.
+
+Store keys start with the content digest of the registry (see
+builder.registry_digest), never with the generation: the directory
+outlives the processes, and a new release must not find the files of the
+previous one.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+from tornado_swirl.cache import LRUCache, SpecEntry
+
+_MAGIC = b'SWIRLSP2'
+_HEADER = struct.Struct('<8s40sQ42s')  # magic, content digest, body length, ETag
+
+
+class SharedSpecStore(object):
+    """Directory of mmap'd encoded spec files shared between processes.
+
+    Files are named after a digest of the store key.  The key starts with
+    the registry content digest, so a published file never changes and a
+    worker maps it once.  Only the keep most recently published files are
+    kept; workers still mapping a removed file keep their mapping.
+    """
+
+    def __init__(self, path, size=16, keep=64):
+        self.path = path
+        self.keep = keep
+        self._views = LRUCache(size)
+        os.makedirs(path, exist_ok=True)
+
+    def _filename(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest + '.spec')
+
+    def get(self, key):
+        """Returns the SpecEntry published for key or None.
+
+        The entry body is a read-only memoryview over the shared mapping.
+        """
+        entry = self._views.get(key)
+        if entry is not None:
+            return entry
+        try:
+            with open(self._filename(key), 'rb') as spec_file:
+                mapping = mmap.mmap(spec_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing or empty file
+            return None
+        if len(mapping) < _HEADER.size:
+            return None
+        magic, content, length, etag = _HEADER.unpack_from(mapping)
+        if magic != _MAGIC or content != key[0].encode('ascii') or \
+                len(mapping) != _HEADER.size + length:
+            return None
+        entry = SpecEntry(memoryview(mapping)[_HEADER.size:],
+                          etag.rstrip(b'\0').decode('ascii'))
+        self._views.set(key, entry)
+        return entry
+
+    def publish(self, key, entry):
+        """Writes entry for key and returns the shared SpecEntry."""
+        body = entry.body
+        header = _HEADER.pack(_MAGIC, key[0].encode('ascii'), len(body),
+                              entry.etag.encode('ascii'))
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as spec_file:
+                spec_file.write(header)
+                spec_file.write(body)
+            os.replace(tmp, self._filename(key))  # atomic for readers
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return entry
+        self.rotate()
+        return self.get(key) or entry
+
+    def rotate(self):
+        """Removes the spec files beyond the keep most recent ones."""
+        files = []
+        for name in os.listdir(self.path):
+            if name.endswith('.spec'):
+                filename = os.path.join(self.path, name)
+                try:
+                    files.append((os.stat(filename).st_mtime_ns, filename))
+                except OSError:  # removed meanwhile
+                    pass
+        for _, filename in sorted(files, reverse=True)[self.keep:]:
+            try:
+                os.unlink(filename)
+            except OSError:
+                pass
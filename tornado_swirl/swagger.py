@@ -1,10 +1,14 @@
 """Swagger decorators"""
 
+import gc
 import inspect
 import tornado.web
 
 from tornado_swirl import docparser, settings
+from tornado_swirl.cache import SpecCache
 from tornado_swirl.handlers import swagger_handlers
+from tornado_swirl.store import SharedSpecStore
+from tornado_swirl.views import warm_spec
 
 class Ref(object):
     def __init__(self, value):
@@ -17,10 +21,17 @@ def is_rest_api_method(obj):
 
 
 def restapi(url, **kwargs):
-    """REST API endpoint decorator."""
+    """REST API endpoint decorator.
+
+    Handlers under one of the exclude_namespaces (URL prefixes or module
+    namespaces) are routed but never parsed nor documented.
+    """
     def _real_decorator(cls):
         cls.rest_api = True
         cls.tagged_api_comps = []
+        if settings.is_excluded(url, cls.__module__):
+            settings.add_route(url, cls, documented=False, **kwargs)
+            return cls
         members = inspect.getmembers(cls, is_rest_api_method)
 
         for name, member in members:
@@ -31,12 +42,31 @@ def restapi(url, **kwargs):
             if path_spec:
                 setattr(member, 'path_spec', path_spec) 
                 cls.tagged_api_comps.append(name)
+        _share_path_params(cls)
         settings.add_api_handler(cls)
         settings.add_route(url, cls, **kwargs)
         return cls
     return _real_decorator
 
 
+def _share_path_params(cls):
+    """Sets the most complete path params found on all operations of cls.
+
+    Operations of the same handler share the URL, so they should have the
+    same path params.  Done once here so spec builds never mutate specs.
+    """
+    path_specs = [member.path_spec for (_, member) in inspect.getmembers(cls)
+                  if hasattr(member, 'path_spec')]
+    if not path_specs:
+        return
+    path_param_spec = path_specs[0].path_params
+    for path_spec in path_specs[1:]:
+        if len(path_spec.path_params) > len(path_param_spec):
+            path_param_spec = path_spec.path_params
+    for path_spec in path_specs:
+        path_spec.path_params = path_param_spec
+
+
 def schema(cls):
     """REST API schema decorator"""
     name = cls.__name__
@@ -73,9 +103,7 @@ def schema(cls):
 
 def describe(title='Your API', description='No description', **kwargs):
     """Describe API"""
-    settings.default_settings.update({"title": title, "description": description})
-    if kwargs:
-        settings.default_settings.update(kwargs)
+    settings.update_settings(title=title, description=description, **kwargs)
 
 def add_global_tag(name, description=None, url=None):
     settings.add_global_tag(name, description, url)
@@ -84,9 +112,43 @@ def add_security_scheme(name, scheme):
     settings.add_security_scheme(name, scheme)
 
 class Application(tornado.web.Application):
-    """Swirl Application class"""
-
-    def __init__(self, handlers=None, default_host="", transforms=None, **kwargs):
+    """Swirl Application class
+
+    Arguments:
+        namespaces -- optional list of module namespaces (``myapp.admin``)
+            and/or URL prefixes (``/admin``).  When given, the app's spec
+            only documents the routes and schemas under them.
+    """
+
+    def __init__(self, handlers=None, default_host="", transforms=None,
+                 namespaces=None, **kwargs):
+        self.registry = settings.RegistryView(namespaces)
+        store_path = settings.default_settings.get('spec_store_path')
+        history_size = settings.default_settings.get('spec_history_size')
+        self.spec_cache = SpecCache(
+            store=SharedSpecStore(store_path) if store_path else None,
+            history_size=8 if history_size is None else history_size)
+        docs = swagger_handlers(self.registry, self.spec_cache)
         super(Application, self).__init__(
-            (swagger_handlers() + handlers) if handlers else swagger_handlers(),
+            (docs + handlers) if handlers else docs,
             default_host, transforms, **kwargs)
+
+
+def warmup(*apps):
+    """Builds the specs of apps ahead of time, typically before forking.
+
+    Freezes the registry, builds each app's spec document (and encodes it
+    when servers are set with describe()) then moves every object alive into the
+    permanent GC generation with gc.freeze() (Python 3.7+), so the garbage
+    collector of the forked workers never touches, hence never copies, the
+    pages holding them.
+
+    Arguments:
+        apps -- the swirl Applications to warm up
+    """
+    settings.freeze()
+    for app in apps:
+        warm_spec(app.spec_cache, app.registry.snapshot())
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
@@ -1,38 +1,49 @@
 # -*- coding: utf-8 -*-
 """Swirl Handlers/Views"""
-import inspect
+import functools
+import hashlib
 import json
-import re
+import os
 
 try:
-    from urllib.parse import urljoin
+    from urllib.parse import quote
 except ImportError:
-    from urlparse import urljoin
+    from urllib import quote
 
 
+import tornado.locks
 import tornado.template
 import tornado.web
-from tornado.util import re_unescape
+import tornado.websocket
+from tornado.ioloop import IOLoop, PeriodicCallback
 
-from tornado_swirl import settings, swagger
+from tornado_swirl import jsonpatch, jsonpointer, optimize, settings
+from tornado_swirl.assets import IMMUTABLE_CACHE_CONTROL
+from tornado_swirl.builder import (doc_tags, find_api, operation_subset, settings_key,
+                                   tag_subset)
+from tornado_swirl.cache import LRUCache, SpecCache, default_executor, make_entry
 
 __author__ = 'rduldulao'
 
 
-def json_dumps(obj, pretty=False):
+def json_dumps(obj, pretty=False, compact=False):
     """Returns JSON string"""
-    return json.dumps(obj,
-                      sort_keys=True,
-                      indent=4,
-                      separators=(',', ': ')) \
-        if pretty else json.dumps(obj)
+    if pretty:
+        return json.dumps(obj,
+                          sort_keys=True,
+                          indent=4,
+                          separators=(',', ': '))
+    return json.dumps(obj, separators=(',', ':')) if compact else json.dumps(obj)
 
 
 class SwaggerUIHandler(tornado.web.RequestHandler):
     """Serves the Swagger UI"""
 
-    def initialize(self, static_path, **kwds):
+    def initialize(self, static_path, bundle=None, page_cache=None, **kwds):
         self.static_path = static_path
+        self.bundle = bundle
+        self.page_cache = page_cache if page_cache is not None else LRUCache(8)
+        self._etag = None
 
     def set_default_headers(self):
         headers = settings.default_settings.get(
@@ -44,366 +55,530 @@ class SwaggerUIHandler(tornado.web.RequestHandler):
         return self.static_path
 
     def get(self):
-        discovery_url = urljoin(
-            self.request.full_url(), self.reverse_url(settings.URL_SWAGGER_API_SPEC))
-        self.render('index.html', discovery_url=discovery_url)
+        tags_url = self.reverse_url(settings.URL_SWAGGER_API_TAGS) \
+            if settings.default_settings.get('spec_split_by_tag') else ''
+        live_url = ''
+        if settings.default_settings.get('spec_live_reload'):
+            try:
+                live_url = self.reverse_url(settings.URL_SWAGGER_API_LIVE)
+            except KeyError:  # turned on after the app was made
+                pass
+        # the page only depends on the settings picking the URLs it loads
+        key = (tags_url, live_url)
+        entry = self.page_cache.get(key)
+        if entry is None:
+            entry = make_entry(self.render_string(
+                'index.html', spec_url=self.reverse_url(settings.URL_SWAGGER_API_SPEC),
+                tags_url=tags_url, live_url=live_url,
+                asset_url=self.bundle.url if self.bundle else lambda name: './' + name))
+            self.page_cache.set(key, entry)
+        self._etag = entry.etag
+        self.set_header('Content-Type', 'text/html; charset=UTF-8')
+        self.finish(entry.body)
+
+    def compute_etag(self):
+        return self._etag
+
+
+class SwaggerAssetHandler(tornado.web.RequestHandler):
+    """Serves the Swagger UI static assets from memory"""
+
+    def initialize(self, bundle):
+        self.bundle = bundle
+        self._etag = None
+
+    def head(self, name, *args):
+        self.get(name, include_body=False)
+
+    def get(self, name, *args, include_body=True):
+        asset = self.bundle.get_fingerprinted(name)
+        if asset is not None:
+            self.set_header('Cache-Control', IMMUTABLE_CACHE_CONTROL)
+        else:
+            asset = self.bundle.get(name)
+        if asset is None:
+            raise tornado.web.HTTPError(404)
+
+        body, self._etag = asset.body, asset.etag
+        self.set_header('Content-Type', asset.content_type)
+        if asset.gzip is not None:
+            self.set_header('Vary', 'Accept-Encoding')
+            if 'gzip' in self.request.headers.get('Accept-Encoding', ''):
+                body, self._etag = asset.gzip, asset.gzip_etag
+                self.set_header('Content-Encoding', 'gzip')
+
+        if include_body:
+            self.finish(body)
+        else:
+            self.set_header('Content-Length', len(body))
+            self.finish()
+
+    def compute_etag(self):
+        return self._etag
 
 
 class SwaggerApiHandler(tornado.web.RequestHandler):
     """Openapi 3.0 spec generator class handler"""
 
+    def initialize(self, registry=None, spec_cache=None):
+        self.registry = registry or settings.RegistryView()
+        self.spec_cache = spec_cache or SpecCache()
+        self._etag = None
+
     def set_default_headers(self):
         headers = settings.default_settings.get(
             'swagger_spec_headers', [])  # type: list
         for (key, value) in headers:
             self.add_header(key, value)
 
-    def get(self):
+    async def get(self):
         """Get handler"""
+        if not self.request.arguments and self._offload():
+            return
+        registry = self.registry.snapshot()
+        servers = self._get_servers()
+        pretty = bool(self.get_arguments('pretty'))
+        tag = self.get_argument('tag', None)
+        compact = bool(self.get_arguments('compact'))
+        pointer, fields = self._get_projection()
+        key, variant = spec_key(registry, servers, pretty, tag, compact, pointer, fields)
+        producer = functools.partial(encode_spec, self.spec_cache, registry, servers, pretty,
+                                     tag, compact, pointer, fields)
+        if pointer is not None or fields:
+            # projections are many and cheap: never served stale nor shared
+            entry = await self.spec_cache.fetch(key, producer,
+                                                cache=self.spec_cache.projections)
+        else:
+            entry = await self.spec_cache.fetch(
+                key, producer, variant, settings.default_settings.get('spec_max_staleness'),
+                registry)
+        self._etag = entry.etag
         self.set_header('content-type', settings.default_settings.get('json_mime_type'))
-        apis = self.find_api()  # this is a generator
-        servers = []
-        server_settings = settings.default_settings.get("servers")
-
-        for server in server_settings:
-            for key in list(server.keys()):
-                if key not in ('url', 'description'):
-                    server.pop(key, None)
-            if server:
-                servers.append(server)
-
-        if not servers:
-            server_host = self.request.host.split(',')[0]
-            forwarded = self.request.headers.get('Forwarded', None)
-            proto = None
-            if forwarded:
-                protopart = [part.strip() for part in forwarded.split(
-                    ';') if part.strip().startswith('proto')]
-                if protopart:
-                    proto = protopart[0].split('=')[-1]
-
-            proto = proto or self.request.headers.get(
-                "X-Forwarded-Proto", None) or self.request.protocol
-            servers = [{
-                'url': proto + "://" + server_host,
-                'description': 'Default server'
-            }]
-
-        specs = {
-            'openapi': settings.SWAGGER_VERSION,
-            'info': {
-                'title': settings.default_settings.get("title"),
-                'description': settings.default_settings.get("description"),
-                'version': settings.default_settings.get("api_version"),
-            },
-            'servers': servers,
-            'paths': {path: self.__get_api_spec(spec, operations)
-                      for path, spec, operations in apis},
-        }
-
-        if settings.SwirlVars.GLOBAL_TAGS:
-            specs['tags'] = settings.SwirlVars.GLOBAL_TAGS
-
-        schemas = settings.get_schemas()
-        if schemas:
-            specs.update(
-                {
-                    "components": {
-                        "schemas": {
-                            name: self.__get_schema_spec(schemaCls)
-                            for (name, schemaCls) in schemas.items()
-                        }
-                    }
-                }
-            )
-
-        security_schemes = settings.SwirlVars.SECURITY_SCHEMES  # type: dict
-        if security_schemes:
-            components = specs.get("components") or {}
-            components['securitySchemes'] = {}
-
-            for name, scheme in security_schemes.items():
-                components['securitySchemes'][name] = scheme.spec()
-            #specs.update(components)
-        
-        self.finish(json_dumps(specs, self.get_arguments('pretty')))
-
-    def __get_schema_spec(self, cls):
-        specs = list(cls.schema_spec)
-        val = {}
-        if len(specs) > 1:
-            val = {"allOf": []}
-            while len(specs) > 1:
-                spec, specs = specs[0], specs[1:]
-                if isinstance(spec, swagger.Ref):
-                    val["allOf"].append({"$ref": spec.link})
-
-        if len(specs) == 1:
-            props = [(prop.name, self._prop_to_dict(prop), prop.required)
-                     for (_, prop) in specs[0].properties.items()]
-
-            required = [name for name, _, req in props if req]
-            obj = {"type": "object"}
-            obj['description'] = specs[0].description or specs[0].summary
-            if required:
-                obj.update({"required": required})
-
-            obj.update({
-                "properties": {
-                    name: d for name, d, r in props
-                }
-            })
-
-            if not val.get("allOf"):
-                val = obj
-            else:
-                val["allOf"].append(obj)
-
-            if specs[0].example:
-                val["example"] = specs[0].example
-            elif specs[0].examples:
-                val["examples"] = specs[0].examples
-
-        return val
-
-    def _prop_to_dict(self, prop):
-        schema = self.__get_type(prop)['schema']
-        if schema is not None:
-            schema.update(prop.kwargs)
-        if prop.description:
-            schema.update({"description": prop.description})
-        return schema
-
-    def __get_api_spec(self, spec, operations):
-        paths = {}
-        for api in operations:
-            paths[api[0]] = {
-                'operationId': str(spec.__name__) + "." + api[0],
-                'summary': api[1].summary.strip(),
-                'description': api[1].description.strip(),
-                'parameters': self.__get_params(api[1]),
-            }
-            if api[1].deprecated:
-                paths[api[0]]['deprecated'] = True
-
-            if api[1].body_params:
-                paths[api[0]]["requestBody"] = self.__get_request_body(api[1])
-
-            paths[api[0]]["responses"] = self.__get_responses(api[1])
-
-            if api[1].tags:
-                paths[api[0]]["tags"] = self.__get_tags(api[1])
-
-            if api[1].security:
-                spec2 = self.__get_security_spec(api[1])
-                if spec2:
-                    paths[api[0]]["security"] = spec2
-
-        return paths
-
-    def __detect_content_from_type(self, val):  # -> (str, bool, str):
-        if val.type.name == "file":
-            return "file", False, val.type.contents
-        if val.type.name in settings.get_schemas().keys():
-            return val.type.name, True, None
-        if val.type.name == 'object':
-            return 'object', True, None
-
-        return val.type.name, False, None
-
-    def __get_params(self, path_spec):
-        params = []
-        allps = sorted(path_spec.path_params.values(), key=lambda x: x.order) + \
-            sorted(path_spec.header_params.values(), key=lambda x: x.order) + \
-            sorted(path_spec.query_params.values(), key=lambda x: x.order) + \
-            sorted(path_spec.cookie_params.values(),
-                   key=lambda x: x.order)  # + \
-        # [path_spec.body_param] body param
-        for param in allps:
-            if param:
-                param_data = {
-                    "in": param.ptype,
-                    "name": param.name,
-                    "required": param.required,
-                    "description": str(param.description).strip()
-                }
-                param_data.update(self.__get_type(param))
-                params.append(param_data)
-        return params
-
-    def __get_tags(self, path_spec):
-        all_tags = sorted(path_spec.tags.values(), key=lambda x: x.order)
-        tag_list = []
-        for tag in all_tags:
-            if tag:
-                tag_list.append(tag.name)
-        return tag_list
-
-    def __get_security_spec(self, path_spec):
-        specs = []
-        for name, schemes in path_spec.security.items():
-            spec = {}
-            scheme = settings.SwirlVars.SECURITY_SCHEMES.get(name)
-            if not scheme:
-                continue
-            if scheme.type not in ('oauth2', 'openIdConnect'):
-                spec[name] = []
-            else:
-                pass  # TODO: support oauth2 and openIdConnect
-            specs.append(spec)
-        return specs
-
-    def __get_request_body(self, path_spec):
-        contents = {}
-        if path_spec.body_params:
-            files_detected = 0  # content = file:xxxx default text/plain
-            form_data_detected = 0  # application/x-www-form-urlencoded
-            models_detected = 0  # application/json or application/xml
-
-            for (_, val) in path_spec.body_params.items():
-                _, ismodel, ftype = self.__detect_content_from_type(val)
-                if ftype is not None:
-                    files_detected += 1
-                elif ismodel:
-                    models_detected += 1
-                else:
-                    form_data_detected += 1
-
-            ctype = ''
-            if form_data_detected > 0 and not files_detected and not models_detected:
-                ctype = 'application/x-www-form-urlencoded'
-                contents[ctype] = {
-                    "schema": {
-                        "properties": {
-                            spec.name: spec.type.schema
-                            for spec in path_spec.body_params.values()
-                        }
-                    }
-                }
-            elif files_detected == 1 and not form_data_detected and not models_detected:
-                entry = list(path_spec.body_params.values())[0]
-                contents[entry.type.contents] = {
-                    "schema": {
-                        "type": "string",
-                        "format": "binary"  # TODO: When to use byte/base64?
-                    }
-                }
-            elif (files_detected > 0 and
-                  (form_data_detected > 0 or models_detected > 0)) or \
-                    models_detected > 1:
-                contents["multipart/form-data"] = {
-                    "schema": {
-                        "properties": {
-                            spec.name: spec.type.schema
-                            for spec in path_spec.body_params.values()
-                        }
-                    }
-                }
-            elif models_detected == 1 and not files_detected and not form_data_detected:
-                params_entry = list(path_spec.body_params.values())[0]
-                file_type = settings.default_settings.get('json_mime_type')
-
-                contents[file_type] = {
-                    "schema":  params_entry.type.schema
-                }
-            else:
-                ctype = 'Unknown'
-
-        return {"content": contents}
-
-    def __get_responses(self, path_spec):
-        params = {}
-        allresps = sorted(path_spec.responses.values(), key=lambda x: x.name)
-        for param in allresps:
-            if param:
-                params[param.name] = {
-                    "description": param.description,
-                    "content":
-                        # should return default produces if none, otherwise detect from type
-                        self._detect_content(param)
-                }
-                # TODO: implement examples
-        return params
-
-    def _detect_content(self, param):
-        if param.type.name == "None":
-            return None
-
-        if param.type.name in ("integer", "number", "string", "boolean"):
-            return {"text/plain": {"schema": param.type.schema}}
-        return {settings.default_settings.get('json_mime_type'): {"schema": param.type.schema}}
-
-    def __get_type(self, param):
-        return {"schema": param.type.schema}
-
-    @staticmethod
-    def find_api():
-        """Gets the API specs
-
-        Returns:
-            path, route_spec, opertiations:  Tuple
-                path -- the API endpoint URL
-                route_spec -- the Tornado Request Handler class
-                operations -- list of tuples containing (method name, PathSpec object)
+        self.finish(bytes(entry.body))  # body may be a shared memoryview
+
+    def compute_etag(self):
+        return self._etag
+
+    def _get_projection(self):
+        """Returns the (pointer tokens, fields) requested with ?pointer= or
+        ?fields=, each None when not given."""
+        pointer = self.get_argument('pointer', None)
+        if pointer is not None:
+            try:
+                pointer = tuple(jsonpointer.parse(pointer))
+            except jsonpointer.PointerError:
+                raise tornado.web.HTTPError(404, 'Invalid JSON pointer')
+        fields = [field.strip() for value in self.get_arguments('fields')
+                  for field in value.split(',') if field.strip()]
+        return pointer, tuple(sorted(set(fields))) or None
+
+    def _offload(self):
+        """Hands serving a prebuilt spec file over to the front proxy.
+
+        Returns True when spec_offload_file exists and the response was sent
+        with only the X-Accel-Redirect (or X-Sendfile) header and the ETag.
         """
-        for route_spec in settings.api_routes():
-            url, _ = _find_groups(route_spec[0])
-            path = url
-            spec = route_spec[1]
-            operations = [(name, member.path_spec) for (
-                name, member) in inspect.getmembers(spec) if hasattr(member, 'path_spec')]
-            # since these ops have the same path, they should have the same path_params
-            # in their path_spec, so get the member with
-            # the most path_param and set it on all
-            if operations:
-                path_param_spec = operations[0][1].path_params
-                for (_, path_spec) in operations[1:]:
-                    if len(path_spec.path_params) > len(path_param_spec):
-                        path_param_spec = path_spec.path_params
-                for _, path_sp in operations:
-                    path_sp.path_params = path_param_spec
-                vals = path_param_spec.values()
-                sorted(vals, key=lambda x: x.order)
-                path = url % tuple(
-                    ['{%s}' % arg for arg in [param.name for param in vals]]
-                )
-
-            else:
-                continue
-
-            yield path, spec, operations
-
-
-def _find_groups(url):
-    """Returns a tuple (reverse string, group count) for a url.
-
-    For example: Given the url pattern /([0-9]{4})/([a-z-]+)/, this method
-    would return ('/%s/%s/', 2).
-    """
-    regex = re.compile(url)
-    pattern = url
-    if pattern.startswith('^'):
-        pattern = pattern[1:]
-    if pattern.endswith('$'):
-        pattern = pattern[:-1]
-
-    if regex.groups != pattern.count('('):
-        # The pattern is too complicated for our simplistic matching,
-        # so we can't support reversing it.
-        return None, None
-
-    pieces = []
-    for fragment in pattern.split('('):
-        if ')' in fragment:
-            paren_loc = fragment.index(')')
-            if paren_loc >= 0:
-                pieces.append('%s' + fragment[paren_loc + 1:])
+        path = settings.default_settings.get('spec_offload_file')
+        if not path:
+            return False
+        self._etag = file_etag(path)
+        if self._etag is None:
+            return False
+        self.set_header('content-type', settings.default_settings.get('json_mime_type'))
+        self.set_header(settings.default_settings.get('spec_offload_header') or 'X-Accel-Redirect',
+                        settings.default_settings.get('spec_offload_uri') or path)
+        self.finish()
+        return True
+
+    def _get_servers(self):
+        return request_servers(self.request)
+
+    find_api = staticmethod(find_api)
+
+
+class SwaggerTagsHandler(SwaggerApiHandler):
+    """Serves the index of the tags and their per-tag spec URLs"""
+
+    async def get(self):
+        registry = self.registry.snapshot()
+        spec_url = self.reverse_url(settings.URL_SWAGGER_API_SPEC)
+        key = (registry.generation, settings_key(), 'tags', spec_url)
+        entry = await self.spec_cache.fetch(
+            key, functools.partial(encode_tags, self.spec_cache, registry, spec_url),
+            registry=registry)
+        self._etag = entry.etag
+        self.set_header('content-type', settings.default_settings.get('json_mime_type'))
+        self.finish(bytes(entry.body))  # body may be a shared memoryview
+
+
+class SwaggerSpecDiffHandler(SwaggerApiHandler):
+    """Serves the changes of the spec since the version a client holds"""
+
+    async def get(self):
+        """Get handler
+
+        Answers a JSON Patch (RFC 6902) from the spec of ETag ``since`` to
+        the current one, or the current spec when since is too old.  The
+        current spec ETag is sent in the X-Spec-ETag header.
+        """
+        since = normalize_etag(self.get_argument('since'))
+        current, entry = await spec_changes(
+            self.spec_cache, self.registry.snapshot(), self._get_servers(), since)
+        self.set_header(SPEC_ETAG_HEADER, current.etag)
+        if entry is None:  # base aged out, send the full spec
+            entry = current
+            self.set_header('content-type', settings.default_settings.get('json_mime_type'))
         else:
+            self.set_header('content-type', JSON_PATCH_MIME_TYPE)
+        self._etag = entry.etag
+        self.finish(bytes(entry.body))
+
+
+class SwaggerLiveHandler(tornado.websocket.WebSocketHandler):
+    """Pushes the spec changes to Swagger UI for live reloading
+
+    Each message is a JSON object holding the new spec ``etag`` and either
+    the JSON ``patch`` from the version the client has or, when that one
+    is too old, the whole ``spec``.  Clients reconnecting pass the ETag
+    they have as ``?since=``.
+    """
+
+    def initialize(self, registry=None, spec_cache=None, watcher=None):
+        self.registry = registry or settings.RegistryView()
+        self.spec_cache = spec_cache or SpecCache()
+        self.watcher = watcher or SpecWatcher(self.registry)
+        self.etag = None
+        self.servers = None
+        self._push_lock = tornado.locks.Lock()
+
+    def open(self):
+        since = self.get_argument('since', None)
+        self.etag = normalize_etag(since) if since else None
+        self.servers = request_servers(self.request)
+        self.watcher.add(self)
+        IOLoop.current().add_callback(self.push)
+
+    def on_close(self):
+        self.watcher.discard(self)
+
+    def on_message(self, message):
+        pass  # nothing to receive
+
+    async def push(self):
+        """Sends the changes since the last version sent, if any.
+
+        Pushes run one at a time, so each patch applies to the version the
+        previous one left the client with.
+        """
+        async with self._push_lock:
             try:
-                unescaped_fragment = re_unescape(fragment)
-            except ValueError:
-                # If we can't unescape part of it, we can't
-                # reverse this url.
-                return (None, None)
-            pieces.append(unescaped_fragment)
-    return ''.join(pieces), regex.groups
+                current, patch = await spec_changes(
+                    self.spec_cache, self.registry.snapshot(), self.servers, self.etag)
+            except Exception:  # pylint: disable=broad-except
+                settings.LOGGER.exception('Cannot build the spec changes')
+                return
+            if current.etag == self.etag:
+                return
+            member = 'patch' if patch is not None else 'spec'
+            message = '{"etag":%s,"%s":%s}' % (json.dumps(current.etag), member,
+                                               bytes((patch or current).body).decode('utf-8'))
+            try:
+                self.write_message(message)
+            except tornado.websocket.WebSocketClosedError:
+                self.watcher.discard(self)
+                return
+            self.etag = current.etag
+
+
+class SpecWatcher(object):
+    """Watches the registry generation of a RegistryView and makes the
+    connected SwaggerLiveHandlers push the changes."""
+
+    def __init__(self, registry, interval=1.0):
+        self.registry = registry
+        self.interval = interval
+        self.clients = set()
+        self._generation = None
+        self._poller = None
+
+    def add(self, client):
+        """Starts pushing the changes to client."""
+        self.clients.add(client)
+        if self._poller is None:
+            self._generation = settings.generation()
+            self._poller = PeriodicCallback(self.poll, self.interval * 1000)
+            self._poller.start()
+
+    def discard(self, client):
+        """Stops pushing the changes to client."""
+        self.clients.discard(client)
+        if not self.clients and self._poller is not None:
+            self._poller.stop()
+            self._poller = None
+
+    def poll(self):
+        """Makes every client push the changes if the registry changed."""
+        generation = settings.generation()
+        if generation != self._generation:
+            self._generation = generation
+            for client in list(self.clients):
+                IOLoop.current().add_callback(client.push)
+
+
+class SwaggerOperationHandler(SwaggerApiHandler):
+    """Serves the spec of one operation, looked up by its operationId"""
+
+    async def get(self, operation_id):
+        """Get handler"""
+        registry = self.registry.snapshot()
+        operation = registry.operations.get(operation_id)
+        if operation is None:
+            raise tornado.web.HTTPError(404, 'Unknown operation %s', operation_id)
+        servers = self._get_servers()
+        pretty = bool(self.get_arguments('pretty'))
+        compact = bool(self.get_arguments('compact'))
+        entry = await self.spec_cache.fetch(
+            (registry.generation, settings_key(), 'operation', operation_id,
+             json_dumps(servers), pretty, compact),
+            functools.partial(encode_operation, self.spec_cache, registry, operation, servers,
+                              pretty, compact),
+            cache=self.spec_cache.operations)
+        self._etag = entry.etag
+        self.set_header('content-type', settings.default_settings.get('json_mime_type'))
+        self.finish(bytes(entry.body))
+
+
+class SwaggerOperationIndexHandler(SwaggerApiHandler):
+    """Serves the compact index of the documented operations"""
+
+    async def get(self):
+        """Get handler"""
+        registry = self.registry.snapshot()
+        entry = await self.spec_cache.fetch(
+            (registry.generation, 'operations'),
+            functools.partial(encode_operation_index, registry))
+        self._etag = entry.etag
+        self.set_header('content-type', settings.default_settings.get('json_mime_type'))
+        self.finish(bytes(entry.body))
+
+
+class SwaggerSearchHandler(SwaggerApiHandler):
+    """Searches the documented operations"""
+
+    async def get(self):
+        """Get handler"""
+        query = self.get_argument('q')
+        limit = self.get_argument('limit', '20')
+        if not limit.isdigit():
+            raise tornado.web.HTTPError(400, 'Invalid limit %s', limit)
+        registry = self.registry.snapshot()
+        index = self.spec_cache.built_search_index(registry)
+        if index is None:
+            index = await IOLoop.current().run_in_executor(
+                self.spec_cache.executor or default_executor(), self.spec_cache.search_index,
+                registry)
+        entry = make_entry(json_dumps([
+            [op.operation_id, op.method, op.path, op.path_spec.summary.strip(),
+             operation_tags(op.path_spec), bool(op.path_spec.deprecated), round(score, 2)]
+            for (op, score) in index.search(query, int(limit))], compact=True).encode('utf-8'))
+        self._etag = entry.etag
+        self.set_header('content-type', settings.default_settings.get('json_mime_type'))
+        self.finish(entry.body)
+
+
+JSON_PATCH_MIME_TYPE = 'application/json-patch+json'
+SPEC_ETAG_HEADER = 'X-Spec-ETag'
+
+_FILE_ETAGS = LRUCache(8)
+
+
+def normalize_etag(etag):
+    """Returns a (possibly weak or unquoted) ETag as a strong quoted one."""
+    etag = etag.strip()
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    return etag if etag.startswith('"') else '"%s"' % etag
+
+
+def file_etag(path):
+    """Returns the ETag of file path, None if it does not exist.
+
+    The file is only hashed again when its size or mtime change.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    etag = _FILE_ETAGS.get(key)
+    if etag is None:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as spec_file:
+            for chunk in iter(lambda: spec_file.read(1 << 16), b''):
+                digest.update(chunk)
+        etag = '"%s"' % digest.hexdigest()
+        _FILE_ETAGS.set(key, etag)
+    return etag
+
+
+def request_servers(request):
+    """Returns the configured servers, else the server of request."""
+    servers = configured_servers()
+    if not servers:
+        server_host = request.host.split(',')[0]
+        forwarded = request.headers.get('Forwarded', None)
+        proto = None
+        if forwarded:
+            protopart = [part.strip() for part in forwarded.split(
+                ';') if part.strip().startswith('proto')]
+            if protopart:
+                proto = protopart[0].split('=')[-1]
+
+        proto = proto or request.headers.get(
+            "X-Forwarded-Proto", None) or request.protocol
+        servers = [{
+            'url': proto + "://" + server_host,
+            'description': 'Default server'
+        }]
+    return servers
+
+
+def configured_servers():
+    """Returns the servers set with describe(servers=...)"""
+    servers = []
+    server_settings = settings.default_settings.get("servers")
+
+    for server in server_settings:
+        for key in list(server.keys()):
+            if key not in ('url', 'description'):
+                server.pop(key, None)
+        if server:
+            servers.append(server)
+    return servers
+
+
+def spec_key(registry, servers, pretty=False, tag=None, compact=False, pointer=None,
+             fields=None):
+    """Returns the (cache key, variant) pair of an encoded spec"""
+    variant = (json_dumps(servers), bool(pretty), tag, bool(compact), pointer, fields)
+    return (registry.generation, settings_key()) + variant, variant
+
+
+def encode_spec(spec_cache, registry, servers, pretty=False, tag=None, compact=False,
+                pointer=None, fields=None):
+    """Builds (or reuses) the document of registry and encodes it.
+
+    Arguments:
+        tag -- only encode the operations with this tag and their schemas
+        compact -- leave out the empty and default valued members
+        pointer -- only encode the value at these JSON pointer tokens
+        fields -- only encode these member paths (see jsonpointer.project)
+
+    Returns:
+        SpecEntry -- the encoded JSON body and its ETag
+    """
+    doc = spec_cache.document(registry)
+    if tag is not None:
+        doc = tag_subset(doc, tag)
+        if doc is None:
+            raise tornado.web.HTTPError(404, 'Unknown tag %s', tag)
+    doc = dict(doc, servers=servers)
+    if compact:
+        doc = optimize.compact(doc)
+    if fields:
+        doc = jsonpointer.project(doc, fields)
+    if pointer is not None:
+        try:
+            doc = jsonpointer.resolve(doc, pointer)
+        except jsonpointer.PointerError:
+            raise tornado.web.HTTPError(404, 'Unknown JSON pointer %s',
+                                        jsonpointer.to_pointer(pointer))
+    entry = make_entry(json_dumps(doc, pretty, compact).encode('utf-8'))
+    if tag is None and not (pretty or compact or fields) and pointer is None:
+        spec_cache.history.set(entry.etag, doc)  # only the full spec is diffed
+    return entry
+
+
+async def spec_changes(spec_cache, registry, servers, since):
+    """Returns (current, patch), the SpecEntry of the current spec of
+    registry and the one of the JSON Patch to it from the spec of ETag
+    since, patch being None when that spec is no longer kept."""
+    key, variant = spec_key(registry, servers)
+    current = await spec_cache.fetch(
+        key, functools.partial(encode_spec, spec_cache, registry, servers),
+        variant, settings.default_settings.get('spec_max_staleness'), registry)
+    patch = None
+    if since == current.etag:
+        patch = make_entry(b'[]')
+    elif since in spec_cache.history:
+        patch = await spec_cache.fetch(
+            ('diff', since, current.etag),
+            functools.partial(encode_patch, spec_cache, since, current.etag),
+            cache=spec_cache.patches)
+    return current, patch
+
+
+def encode_patch(spec_cache, since, etag):
+    """Returns the SpecEntry of the JSON Patch from the spec document of
+    ETag since to the one of ETag etag, None if either is not kept."""
+    base, doc = spec_cache.history.get(since), spec_cache.history.get(etag)
+    if base is None or doc is None:
+        return None
+    return make_entry(json_dumps(jsonpatch.diff(base, doc), compact=True).encode('utf-8'))
+
+
+def encode_operation(spec_cache, registry, operation, servers, pretty=False, compact=False):
+    """Returns the SpecEntry of the document of one operations.Operation of
+    registry, holding it and the components it references."""
+    doc = operation_subset(spec_cache.document(registry), operation.path, operation.method)
+    if doc is None:
+        raise tornado.web.HTTPError(404, 'Unknown operation %s', operation.operation_id)
+    doc = dict(doc, servers=servers)
+    if compact:
+        doc = optimize.compact(doc)
+    return make_entry(json_dumps(doc, pretty, compact).encode('utf-8'))
+
+
+def operation_tags(path_spec):
+    """Returns the tag names of an operation PathSpec, in docstring order."""
+    return [tag.name for tag in sorted(path_spec.tags.values(), key=lambda x: x.order) if tag]
+
+
+def encode_operation_index(registry):
+    """Returns the SpecEntry of the operation index of registry.
+
+    Each operation is a ``[operationId, method, path, summary, tags,
+    deprecated]`` array, sorted by path and method.  Read from the
+    registration index, without building the spec.
+    """
+    rows = [[op.operation_id, op.method, op.path, op.path_spec.summary.strip(),
+             operation_tags(op.path_spec), bool(op.path_spec.deprecated)]
+            for op in sorted(registry.operations.values(), key=lambda op: (op.path, op.method))]
+    return make_entry(json_dumps(rows, compact=True).encode('utf-8'))
+
+
+def encode_tags(spec_cache, registry, spec_url):
+    """Returns the SpecEntry of the tag index of registry."""
+    doc = spec_cache.document(registry)
+    descriptions = {tag.get('name'): tag.get('description') for tag in doc.get('tags', ())}
+    tags = [{
+        'name': name,
+        'description': descriptions.get(name) or '',
+        'operations': count,
+        'url': spec_url + '?tag=' + quote(name, safe=''),
+    } for (name, count) in doc_tags(doc)]
+    return make_entry(json_dumps(tags).encode('utf-8'))
+
+
+def warm_spec(spec_cache, registry):
+    """Builds the document of registry into spec_cache on this thread.
+
+    Also encodes the default variant when servers are set with describe(),
+    the ones requests are served with; otherwise they depend on each
+    request's host.
+    """
+    spec_cache.document(registry)
+    servers = configured_servers()
+    if servers:
+        key, variant = spec_key(registry, servers)
+        spec_cache.store_entry(key, encode_spec(spec_cache, registry, servers), variant)